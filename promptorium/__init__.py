@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from .services import PromptService
 from .storage.fs import FileSystemPromptStorage
-from .util.repo_root import find_repo_root
+from .util.repo_root import find_repo_root_cached
 
 
 def load_prompt(key: str, version: int | None = None) -> str:
@@ -11,7 +11,7 @@ def load_prompt(key: str, version: int | None = None) -> str:
     This is a thin convenience wrapper that constructs a filesystem-backed storage
     rooted at the repository and delegates to the service layer.
     """
-    storage = FileSystemPromptStorage(find_repo_root())
+    storage = FileSystemPromptStorage(find_repo_root_cached())
     service = PromptService(storage)
     return service.load_prompt(key, version)
 
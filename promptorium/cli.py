@@ -5,18 +5,22 @@ from pathlib import Path
 
 import typer
 
-from .domain import PromptError
+from .domain import OnConflict, PromptError
 from .services import PromptService
 from .storage.fs import FileSystemPromptStorage
-from .util import editor as editor_util
-from .util.render import render_diff_to_console
-from .util.repo_root import find_repo_root
+from .util.formatting import (
+    format_no_changes,
+    format_prompt_details,
+    format_sync_results,
+    format_synced,
+)
+from .util.repo_root import find_repo_root_cached
 
 app = typer.Typer(add_completion=False)
 
 
 def _service() -> PromptService:
-    storage = FileSystemPromptStorage(find_repo_root())
+    storage = FileSystemPromptStorage(find_repo_root_cached())
     return PromptService(storage)
 
 
@@ -48,19 +52,15 @@ def sync(
         if key:
             result = svc.sync_prompt(key, force)
             if result.changed:
-                typer.echo(f"Synced '{key}': v{result.old_version} -> v{result.new_version}")
+                typer.echo(format_synced(key, result.old_version, result.new_version))
             else:
-                typer.echo(f"No changes for '{key}' (at v{result.old_version})")
+                typer.echo(format_no_changes(key, result.old_version))
         else:
             results = svc.sync_all()
             if not results:
                 typer.echo("No source-tracked prompts found.")
                 return
-            for r in results:
-                if r.changed:
-                    typer.echo(f"Synced '{r.key}': v{r.old_version} -> v{r.new_version}")
-                else:
-                    typer.echo(f"Unchanged: '{r.key}' (at v{r.old_version})")
+            typer.echo(format_sync_results(results))
     except PromptError as e:
         typer.secho(str(e), err=True, fg=typer.colors.RED)
         raise typer.Exit(1)
@@ -103,7 +103,9 @@ def update(
                 seed = svc.load_prompt(key)
             except PromptError:
                 seed = ""
-            text = editor_util.open_in_editor(seed)
+            from .util.editor import open_in_editor
+
+            text = open_in_editor(seed)
         else:
             if sys.stdin.isatty():
                 typer.secho(
@@ -126,13 +128,11 @@ def list_() -> None:
     if not infos:
         typer.echo("No prompts tracked.")
         raise typer.Exit()
+    lines: list[str] = []
     for info in infos:
-        typer.echo(f"\n{info.ref.key}")
-        typer.echo(f"  Source: {info.ref.source_file}")
-        typer.echo(f"  Versions: {info.ref.version_dir}")
-        for v in info.versions:
-            typer.echo(f"    - v{v.version}: {v.path}")
-    typer.echo("")
+        lines.extend(["", info.ref.key, *format_prompt_details(info)])
+    lines.append("")
+    typer.echo("\n".join(lines))
 
 
 @app.command()
@@ -169,6 +169,8 @@ def diff(
     granularity: str = typer.Option("word", "--granularity", "--g"),
 ) -> None:
     """Show differences between two versions of a prompt."""
+    from .util.render import render_diff_to_console
+
     try:
         res = _service().diff_versions(key, v1, v2, granularity=granularity)
         render_diff_to_console(res)
@@ -181,18 +183,29 @@ def diff(
 def migrate(
     from_version: int = typer.Option(1, "--from", help="Source schema version"),
     to_version: int = typer.Option(2, "--to", help="Target schema version"),
-    prompts_dir: Path | None = typer.Option(None, "--prompts-dir", help="Directory for source files"),
+    prompts_dir: Path | None = typer.Option(
+        None, "--prompts-dir", help="Directory for source files"
+    ),
+    non_interactive: bool = typer.Option(
+        False, "--non-interactive", help="Don't prompt; resolve existing source files by policy"
+    ),
+    on_conflict: OnConflict = typer.Option(
+        "use-existing",
+        "--on-conflict",
+        help="With --non-interactive: how to resolve existing source files",
+    ),
 ) -> None:
     """Migrate prompt metadata between schema versions."""
     from .migration import migrate as do_migrate
 
     try:
         result = do_migrate(
-            repo_root=find_repo_root(),
+            repo_root=find_repo_root_cached(),
             from_version=from_version,
             to_version=to_version,
             prompts_dir=prompts_dir,
-            interactive=True,
+            interactive=not non_interactive,
+            on_conflict=on_conflict,
         )
         typer.echo(f"Migrated {result['migrated']} prompt(s) from v{from_version} to v{to_version}")
     except ValueError as e:
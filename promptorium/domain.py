@@ -6,7 +6,7 @@ from pathlib import Path
 from typing import Literal
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PromptRef:
     key: str
     source_file: Path  # path to source of truth file
@@ -14,14 +14,14 @@ class PromptRef:
     managed_by_root: bool  # version_dir under <repo-root>/.prompts ?
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PromptVersion:
     key: str
     version: int
     path: Path
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PromptInfo:
     ref: PromptRef
     versions: Sequence[PromptVersion]  # sorted ascending
@@ -29,14 +29,17 @@ class PromptInfo:
 
 DiffOp = Literal["equal", "insert", "delete"]
 
+# What a non-interactive migration does when prompts/<key>.md already exists
+OnConflict = Literal["use-existing", "overwrite", "skip"]
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class DiffSegment:
     op: DiffOp
     text: str
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DiffResult:
     key: str
     v1: int
@@ -44,7 +47,7 @@ class DiffResult:
     segments: Sequence[DiffSegment]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SyncResult:
     key: str
     changed: bool
@@ -21,24 +21,31 @@ Usage:
 
 from __future__ import annotations
 
+import os
 import subprocess
 import sys
 from pathlib import Path
 
 
 def get_staged_files(repo_root: Path) -> set[Path]:
-    """Get the set of staged files from git."""
+    """Get the set of staged files from git, as absolute normalized paths."""
     try:
+        # -z: raw NUL-terminated names, no quoting of unusual filenames and no decode pass
         result = subprocess.run(
-            ["git", "diff", "--cached", "--name-only", "--diff-filter=ACM"],
+            ["git", "diff", "--cached", "--name-only", "--diff-filter=ACM", "-z"],
             capture_output=True,
-            text=True,
             check=True,
             cwd=repo_root,
         )
-        return {(repo_root / f.strip()).resolve() for f in result.stdout.splitlines() if f.strip()}
     except subprocess.CalledProcessError:
         return set()
+    # Resolve the root once; git paths are repo-relative so a lexical join suffices
+    root = repo_root.resolve()
+    return {
+        Path(os.path.normpath(root / os.fsdecode(name)))
+        for name in result.stdout.split(b"\x00")
+        if name
+    }
 
 
 def main() -> int:
@@ -66,14 +73,16 @@ def main() -> int:
         # Find staged source files that need versioning
         from ..domain import SyncResult
 
-        needs_versioning: list[tuple[str, Path, SyncResult]] = []
-        for key, source_path in source_files:
-            resolved = source_path.resolve()
-            if resolved in staged:
-                # Sync to create new version
-                result = svc.sync_prompt(key, force=False)
-                if result.changed:
-                    needs_versioning.append((key, source_path, result))
+        resolved_sources = {key: path.resolve() for key, path in source_files}
+        staged_keys = [key for key, path in resolved_sources.items() if path in staged]
+        if not staged_keys:
+            return 0
+
+        # Sync all staged sources in a single batched pass
+        paths = dict(source_files)
+        needs_versioning: list[tuple[str, Path, SyncResult]] = [
+            (r.key, paths[r.key], r) for r in svc.sync_all(staged_keys) if r.changed
+        ]
 
         if needs_versioning:
             print("promptorium: The following source files have changes:")
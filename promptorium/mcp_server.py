@@ -4,26 +4,71 @@ from __future__ import annotations
 
 import argparse
 import os
+from collections.abc import Callable
+from functools import lru_cache
 from pathlib import Path
-
-from mcp.server.fastmcp import FastMCP
+from typing import TYPE_CHECKING, Any
 
 from .domain import PromptError
 from .services import PromptService
 from .storage.fs import FileSystemPromptStorage
-from .util.repo_root import find_repo_root
+from .util.formatting import (
+    format_inline_diff,
+    format_no_changes,
+    format_prompt_details,
+    format_sync_results,
+    format_synced,
+)
+from .util.repo_root import find_repo_root_cached
+
+if TYPE_CHECKING:
+    from mcp.server.fastmcp import FastMCP
+
+
+def _err(e: Exception) -> str:
+    """Format an error as the tool reply, so failures read the same from every tool."""
+    return f"Error: {e}"
+
+
+# Tool functions, registered on the FastMCP server when it is first built
+_TOOLS: list[Callable[..., str]] = []
+
+
+def _tool(fn: Callable[..., str]) -> Callable[..., str]:
+    """Mark ``fn`` as an MCP tool; registration happens in :func:`get_server`."""
+    _TOOLS.append(fn)
+    return fn
 
-# Create FastMCP server
-mcp = FastMCP(name="promptorium")
+
+@lru_cache(maxsize=1)
+def get_server() -> FastMCP:
+    """Build the FastMCP server, importing ``mcp`` only when it is actually needed."""
+    from mcp.server.fastmcp import FastMCP
+
+    server = FastMCP(name="promptorium")
+    for fn in _TOOLS:
+        server.tool()(fn)
+    return server
+
+
+def __getattr__(name: str) -> Any:
+    # Keep ``promptorium.mcp_server.mcp`` available for tooling that looks up the server
+    if name == "mcp":
+        return get_server()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@lru_cache(maxsize=8)
+def _service_for(repo_root: Path) -> PromptService:
+    return PromptService(FileSystemPromptStorage(repo_root))
 
 
 def _get_service() -> PromptService:
-    """Get a configured PromptService instance."""
-    storage = FileSystemPromptStorage(find_repo_root())
-    return PromptService(storage)
+    """Get the PromptService for the current repository, reused across tool calls."""
+    return _service_for(find_repo_root_cached())
 
 
-@mcp.tool()
+@_tool
 def list_prompts() -> str:
     """List all tracked prompts with their versions.
 
@@ -36,19 +81,16 @@ def list_prompts() -> str:
         if not infos:
             return "No prompts tracked."
 
-        lines = []
+        lines: list[str] = []
         for info in infos:
             lines.append(f"Key: {info.ref.key}")
-            lines.append(f"  Source: {info.ref.source_file}")
-            lines.append(f"  Versions: {info.ref.version_dir}")
-            for v in info.versions:
-                lines.append(f"    - v{v.version}: {v.path}")
+            lines.extend(format_prompt_details(info))
         return "\n".join(lines)
     except PromptError as e:
-        return f"Error: {e}"
+        return _err(e)
 
 
-@mcp.tool()
+@_tool
 def load_prompt(key: str, version: int | None = None) -> str:
     """Load the content of a prompt.
 
@@ -63,10 +105,10 @@ def load_prompt(key: str, version: int | None = None) -> str:
         svc = _get_service()
         return svc.load_prompt(key, version)
     except PromptError as e:
-        return f"Error: {e}"
+        return _err(e)
 
 
-@mcp.tool()
+@_tool
 def track_prompt(
     source_file: str,
     key: str | None = None,
@@ -93,10 +135,10 @@ def track_prompt(
             msg += f" (initial version: v{initial_ver.version})"
         return msg
     except PromptError as e:
-        return f"Error: {e}"
+        return _err(e)
 
 
-@mcp.tool()
+@_tool
 def update_prompt(key: str, content: str) -> str:
     """Update a prompt with new content.
 
@@ -114,10 +156,10 @@ def update_prompt(key: str, content: str) -> str:
         v = svc.update_prompt(key, content)
         return f"Updated {v.key} -> v{v.version}"
     except PromptError as e:
-        return f"Error: {e}"
+        return _err(e)
 
 
-@mcp.tool()
+@_tool
 def sync_prompts(key: str | None = None, force: bool = False) -> str:
     """Sync source files to create new versions if changed.
 
@@ -134,24 +176,18 @@ def sync_prompts(key: str | None = None, force: bool = False) -> str:
         if key:
             result = svc.sync_prompt(key, force)
             if result.changed:
-                return f"Synced '{key}': v{result.old_version} -> v{result.new_version}"
-            return f"No changes for '{key}' (at v{result.old_version})"
+                return format_synced(key, result.old_version, result.new_version)
+            return format_no_changes(key, result.old_version)
         else:
             results = svc.sync_all()
             if not results:
                 return "No source-tracked prompts found"
-            lines = []
-            for r in results:
-                if r.changed:
-                    lines.append(f"Synced '{r.key}': v{r.old_version} -> v{r.new_version}")
-                else:
-                    lines.append(f"Unchanged: '{r.key}' (at v{r.old_version})")
-            return "\n".join(lines)
+            return format_sync_results(results)
     except PromptError as e:
-        return f"Error: {e}"
+        return _err(e)
 
 
-@mcp.tool()
+@_tool
 def delete_prompt(key: str, all_versions: bool = False) -> str:
     """Delete a prompt or its latest version.
 
@@ -171,10 +207,10 @@ def delete_prompt(key: str, all_versions: bool = False) -> str:
             v = svc.delete_prompt(key, delete_all=False)
             return f"Deleted v{v.version} for '{key}'"
     except PromptError as e:
-        return f"Error: {e}"
+        return _err(e)
 
 
-@mcp.tool()
+@_tool
 def untrack_prompt(key: str, keep_versions: bool = True) -> str:
     """Stop tracking a source file.
 
@@ -192,10 +228,10 @@ def untrack_prompt(key: str, keep_versions: bool = True) -> str:
             return f"Untracked '{key}' (versions kept)"
         return f"Untracked '{key}' (versions deleted)"
     except PromptError as e:
-        return f"Error: {e}"
+        return _err(e)
 
 
-@mcp.tool()
+@_tool
 def diff_versions(key: str, v1: int, v2: int, granularity: str = "word") -> str:
     """Show differences between two versions of a prompt.
 
@@ -211,23 +247,12 @@ def diff_versions(key: str, v1: int, v2: int, granularity: str = "word") -> str:
     try:
         svc = _get_service()
         result = svc.diff_versions(key, v1, v2, granularity=granularity)
-
-        lines = [f"Diff {key} v{v1} -> v{v2}:", ""]
-        parts = []
-        for seg in result.segments:
-            if seg.op == "equal":
-                parts.append(seg.text)
-            elif seg.op == "insert":
-                parts.append(f"[+{seg.text}]")
-            elif seg.op == "delete":
-                parts.append(f"[-{seg.text}]")
-        lines.append("".join(parts))
-        return "\n".join(lines)
+        return format_inline_diff(result)
     except PromptError as e:
-        return f"Error: {e}"
+        return _err(e)
 
 
-@mcp.tool()
+@_tool
 def migrate_schema(
     from_version: int = 1,
     to_version: int = 2,
@@ -247,7 +272,7 @@ def migrate_schema(
 
     try:
         result = do_migrate(
-            repo_root=find_repo_root(),
+            repo_root=find_repo_root_cached(),
             from_version=from_version,
             to_version=to_version,
             prompts_dir=Path(prompts_dir) if prompts_dir else None,
@@ -255,7 +280,7 @@ def migrate_schema(
         )
         return f"Migrated {result['migrated']} prompt(s) from v{from_version} to v{to_version}"
     except ValueError as e:
-        return f"Error: {e}"
+        return _err(e)
 
 
 def run_server() -> None:
@@ -280,6 +305,7 @@ def run_server() -> None:
     )
     args = parser.parse_args()
 
+    mcp = get_server()
     if args.transport == "sse":
         # Configure host/port via settings for SSE transport
         mcp.settings.host = args.host
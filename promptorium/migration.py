@@ -2,51 +2,179 @@
 
 from __future__ import annotations
 
-import hashlib
-import json
-import re
+import os
 import shutil
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from typing import get_args
+
+from .domain import OnConflict
+from .util.hash_cache import load_hash_cache, make_record, save_hash_cache
+from .util.hashing import compute_file_hash
+from .util.io_safety import atomic_write_bytes, io_worker_count
+from .util.jsonio import dumps_json, loads_json
+from .util.version_names import custom_version_re, default_version_number
+
+ON_CONFLICT_CHOICES: tuple[str, ...] = get_args(OnConflict)
+
+
+def _iter_default_versions(version_dir: Path) -> Iterator[tuple[int, Path]]:
+    """Yield version files in default-managed format: <n>.md (unordered)."""
+    try:
+        it = os.scandir(version_dir)
+    except FileNotFoundError:
+        return
+    with it:
+        for entry in it:
+            n = default_version_number(entry.name)
+            if n is not None and entry.is_file():
+                yield n, Path(entry.path)
+
+
+def _iter_custom_versions(key: str, version_dir: Path) -> Iterator[tuple[int, Path]]:
+    """Yield version files in custom-managed format: <key>-<n>.md (unordered)."""
+    prefix = f"{key}-"
+    try:
+        it = os.scandir(version_dir)
+    except FileNotFoundError:
+        return
+    with it:
+        for entry in it:
+            name = entry.name
+            # Cheap prefix/suffix filter before running the regex
+            if not (name.startswith(prefix) and name.endswith(".md")):
+                continue
+            m = custom_version_re(key).fullmatch(name)
+            if m and entry.is_file():
+                yield int(m.group(1)), Path(entry.path)
+
+
+def _scan_versions_latest(versions: Iterable[tuple[int, Path]]) -> tuple[int, Path] | None:
+    """Return the highest-numbered version in a single pass, without sorting."""
+    return max(versions, key=lambda t: t[0], default=None)
+
+
+def _store_path(path: Path, repo_root: Path) -> str:
+    """Return ``path`` as POSIX relative to the resolved ``repo_root``, else absolute.
+
+    Uses a lexical containment check on the resolved path instead of catching the
+    ``ValueError`` raised by ``relative_to``.
+    """
+    resolved = path.resolve()
+    if resolved.is_relative_to(repo_root):
+        return resolved.relative_to(repo_root).as_posix()
+    return str(resolved)
+
 
+@dataclass(frozen=True, slots=True)
+class _PlanEntry:
+    """What migrating one prompt will do; built up front, executed later."""
 
-def compute_hash(content: str) -> str:
-    """Compute SHA256 hash of content."""
-    return f"sha256:{hashlib.sha256(content.encode('utf-8')).hexdigest()}"
-
-
-def _scan_default_versions(key: str, version_dir: Path) -> list[tuple[int, Path]]:
-    """Scan for version files in default-managed format: <n>.md"""
-    versions: list[tuple[int, Path]] = []
-    if not version_dir.exists():
-        return []
-    for p in version_dir.iterdir():
-        if p.is_file() and re.fullmatch(r"\d+\.md", p.name):
-            n = int(p.stem)
-            versions.append((n, p))
-    versions.sort(key=lambda t: t[0])
-    return versions
-
-
-def _scan_custom_versions(key: str, version_dir: Path) -> list[tuple[int, Path]]:
-    """Scan for version files in custom-managed format: <key>-<n>.md"""
-    pattern = re.compile(rf"^{re.escape(key)}-(\d+)\.md$")
-    versions: list[tuple[int, Path]] = []
-    if not version_dir.exists():
-        return []
-    for p in version_dir.iterdir():
-        if p.is_file():
-            m = pattern.fullmatch(p.name)
-            if m:
-                n = int(m.group(1))
-                versions.append((n, p))
-    versions.sort(key=lambda t: t[0])
-    return versions
+    key: str
+    version_dir: Path
+    latest_version: int
+    latest_path: Path
+    source_file: Path
+    seed_from_latest: bool  # (over)write source_file with the latest version first
+
+
+def _plan_one(
+    prompt_info: dict,
+    repo_root: Path,
+    prompts_dir: Path,
+    interactive: bool,
+    on_conflict: OnConflict,
+) -> _PlanEntry | None:
+    """Decide where a prompt's source file lives; returns None to skip it.
+
+    All user input happens here, so execution can run without a terminal.
+    """
+    key = prompt_info["key"]
+    version_dir = prompt_info["version_dir"]
+    latest_version, latest_path = prompt_info["latest"]
+
+    if interactive:
+        print(f"Prompt: {key}")
+        print(f"  Version dir: {version_dir}")
+        print(f"  Latest version: v{latest_version} at {latest_path}")
+
+    # Determine source file location
+    source_file = prompts_dir / f"{key}.md"
+    exists = source_file.exists()
+
+    # Check if source file already exists
+    if exists and interactive:
+        print(f"  Source file already exists: {source_file}")
+        response = input("  Use existing file? [Y/n]: ").strip().lower()
+        if response in ("n", "no"):
+            custom_path = input("  Enter custom source file path: ").strip()
+            source_file = Path(custom_path)
+            if not source_file.is_absolute():
+                source_file = repo_root / source_file
+            exists = source_file.exists()
+    elif exists and on_conflict == "skip":
+        return None
+
+    seed = not exists or (not interactive and on_conflict == "overwrite")
+    if interactive:
+        if seed:
+            print(f"  Will create source file: {source_file}")
+        print("  Ready to migrate\n")
+    return _PlanEntry(
+        key=key,
+        version_dir=version_dir,
+        latest_version=latest_version,
+        latest_path=latest_path,
+        source_file=source_file,
+        seed_from_latest=seed,
+    )
+
+
+def _execute_one(
+    entry: _PlanEntry, repo_root: Path, hash_cache: dict[str, dict]
+) -> tuple[str, dict, dict | None]:
+    """Carry out a planned prompt; returns ``(key, v2_entry, hash_cache_record)``.
+
+    ``repo_root`` must already be resolved. The record is None when the source's
+    mtime is too recent to trust, as for a file this run just created.
+    """
+    source_file = entry.source_file
+    source_str = _store_path(source_file, repo_root)
+
+    # Hash the chosen source exactly once: seed it from the latest version (copyfile
+    # copies in the kernel where it can), or hash an existing file as-is. A migration
+    # retried after an interruption reuses the cached hash when size and mtime match.
+    if entry.seed_from_latest:
+        source_file.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(entry.latest_path, source_file)
+        st = os.stat(source_file)
+        content_hash = compute_file_hash(source_file)
+    else:
+        st = os.stat(source_file)
+        cached = hash_cache.get(source_str, {})
+        same_stat = (cached.get("size"), cached.get("mtime_ns")) == (st.st_size, st.st_mtime_ns)
+        if same_stat and cached.get("hash"):
+            content_hash = cached["hash"]
+        else:
+            content_hash = compute_file_hash(source_file)
+    cache_record = make_record(st, content_hash)
+
+    v2_entry = {
+        "source_file": source_str,
+        "version_dir": _store_path(entry.version_dir, repo_root),
+        "last_hash": content_hash,
+        "last_version": entry.latest_version,
+    }
+    return entry.key, v2_entry, cache_record
 
 
 def _migrate_v1_to_v2(
     repo_root: Path,
     prompts_dir: Path | None = None,
     interactive: bool = True,
+    on_conflict: OnConflict = "use-existing",
 ) -> dict:
     """Migrate from v1 to v2 schema.
 
@@ -54,9 +182,11 @@ def _migrate_v1_to_v2(
         repo_root: Repository root directory
         prompts_dir: Directory for source files (default: <repo-root>/prompts)
         interactive: If True, prompt user for input; if False, auto-create source files
+        on_conflict: Non-interactive policy for existing source files
 
     Returns:
-        dict with migration results: {"migrated": int, "backup_path": Path | None, "source_dir": Path}
+        dict with migration results:
+        {"migrated": int, "backup_path": Path | None, "source_dir": Path}
     """
     prompts_root = repo_root / ".prompts"
     meta_path = prompts_root / "_meta.json"
@@ -69,64 +199,75 @@ def _migrate_v1_to_v2(
             print(f"No _meta.json found at {meta_path}. Nothing to migrate.")
         return {"migrated": 0, "backup_path": None, "source_dir": prompts_dir}
 
-    # Back up existing metadata
-    backup_path = prompts_root / "_meta.json.v1.bak"
-    shutil.copy(meta_path, backup_path)
-    if interactive:
-        print(f"Backed up existing metadata to {backup_path}")
-
     # Load v1 metadata
-    with open(meta_path, encoding="utf-8") as f:
-        v1_data = json.load(f)
+    v1_data = loads_json(meta_path.read_bytes())
+    backup_path = prompts_root / "_meta.json.v1.bak"
 
     schema = v1_data.get("schema", 1)
     if schema >= 2:
+        # Already migrated: leave the existing v1 backup untouched
         if interactive:
             print(f"Metadata is already schema version {schema}. Nothing to migrate.")
-        return {"migrated": 0, "backup_path": backup_path, "source_dir": prompts_dir}
+        return {
+            "migrated": 0,
+            "backup_path": backup_path if backup_path.exists() else None,
+            "source_dir": prompts_dir,
+        }
+
+    # Back up existing metadata
+    shutil.copy(meta_path, backup_path)
+    if interactive:
+        print(f"Backed up existing metadata to {backup_path}")
 
     custom_dirs = v1_data.get("custom_dirs", {})
 
     # Discover all prompts
     prompts_to_migrate: list[dict] = []
 
-    # Default-managed prompts (directories under .prompts/)
-    if prompts_root.exists():
-        for p in prompts_root.iterdir():
-            if p.is_dir() and p.name != "__pycache__" and not p.name.startswith("_"):
-                key = p.name
-                if key not in custom_dirs:
-                    versions = _scan_default_versions(key, p)
-                    if versions:
-                        prompts_to_migrate.append({
-                            "key": key,
-                            "version_dir": p,
-                            "versions": versions,
-                            "managed_by_root": True,
-                        })
+    # Default-managed prompts (directories under .prompts/); prompts_root exists
+    # since _meta.json does. scandir gives the entry type, so only symlinks (which
+    # are followed, as the storage does) cost a stat
+    with os.scandir(prompts_root) as it:
+        for entry in it:
+            key = entry.name
+            if key.startswith("_") or key in custom_dirs:
+                continue
+            if not entry.is_dir():
+                continue
+            version_dir = Path(entry.path)
+            latest = _scan_versions_latest(_iter_default_versions(version_dir))
+            if latest:
+                prompts_to_migrate.append(
+                    {
+                        "key": key,
+                        "version_dir": version_dir,
+                        "latest": latest,
+                        "managed_by_root": True,
+                    }
+                )
 
     # Custom-managed prompts
     for key, dir_val in custom_dirs.items():
         dir_path = Path(dir_val)
         if not dir_path.is_absolute():
             dir_path = repo_root / dir_path
-        versions = _scan_custom_versions(key, dir_path)
-        if versions:
-            prompts_to_migrate.append({
-                "key": key,
-                "version_dir": dir_path,
-                "versions": versions,
-                "managed_by_root": False,
-            })
+        latest = _scan_versions_latest(_iter_custom_versions(key, dir_path))
+        if latest:
+            prompts_to_migrate.append(
+                {
+                    "key": key,
+                    "version_dir": dir_path,
+                    "latest": latest,
+                    "managed_by_root": False,
+                }
+            )
 
     if not prompts_to_migrate:
         if interactive:
             print("No prompts found to migrate.")
         # Still create v2 metadata with empty prompts
         v2_data = {"schema": 2, "prompts": {}}
-        with open(meta_path, "w", encoding="utf-8") as f:
-            json.dump(v2_data, f, indent=2)
-            f.write("\n")
+        atomic_write_bytes(meta_path, dumps_json(v2_data))
         if interactive:
             print("Created empty v2 metadata.")
         return {"migrated": 0, "backup_path": backup_path, "source_dir": prompts_dir}
@@ -137,72 +278,43 @@ def _migrate_v1_to_v2(
     prompts_dir.mkdir(parents=True, exist_ok=True)
 
     v2_prompts: dict[str, dict] = {}
-
-    for prompt_info in prompts_to_migrate:
-        key = prompt_info["key"]
-        version_dir = prompt_info["version_dir"]
-        versions = prompt_info["versions"]
-        latest_version, latest_path = versions[-1]
-
-        if interactive:
-            print(f"Prompt: {key}")
-            print(f"  Version dir: {version_dir}")
-            print(f"  Latest version: v{latest_version} at {latest_path}")
-
-        # Determine source file location
-        source_file = prompts_dir / f"{key}.md"
-
-        # Check if source file already exists
-        if source_file.exists():
-            if interactive:
-                print(f"  Source file already exists: {source_file}")
-                response = input("  Use existing file? [Y/n]: ").strip().lower()
-                if response in ("n", "no"):
-                    custom_path = input("  Enter custom source file path: ").strip()
-                    source_file = Path(custom_path)
-                    if not source_file.is_absolute():
-                        source_file = repo_root / source_file
-            # Non-interactive: use existing file as-is
-        else:
-            # Create source file from latest version
-            if interactive:
-                print(f"  Creating source file: {source_file}")
-            content = latest_path.read_text(encoding="utf-8")
-            source_file.parent.mkdir(parents=True, exist_ok=True)
-            source_file.write_text(content, encoding="utf-8")
-
-        # Compute hash
-        content = source_file.read_text(encoding="utf-8")
-        content_hash = compute_hash(content)
-
-        # Store relative paths if possible
-        try:
-            source_rel = source_file.resolve().relative_to(repo_root)
-            source_str = source_rel.as_posix()
-        except ValueError:
-            source_str = str(source_file.resolve())
-
-        try:
-            version_rel = version_dir.resolve().relative_to(repo_root)
-            version_str = version_rel.as_posix()
-        except ValueError:
-            version_str = str(version_dir.resolve())
-
-        v2_prompts[key] = {
-            "source_file": source_str,
-            "version_dir": version_str,
-            "last_hash": content_hash,
-            "last_version": latest_version,
-        }
-
-        if interactive:
-            print("  Migrated to v2 format\n")
+    hash_cache = load_hash_cache(prompts_root)
+    new_hash_cache: dict[str, dict] = {}
+
+    root_resolved = repo_root.resolve()
+
+    # Plan every prompt first (all input() happens here), then execute the I/O
+    plan = [
+        planned
+        for prompt_info in prompts_to_migrate
+        if (planned := _plan_one(prompt_info, root_resolved, prompts_dir, interactive, on_conflict))
+    ]
+
+    def run(entry: _PlanEntry) -> tuple[str, dict]:
+        key, v2_entry, cache_record = _execute_one(entry, root_resolved, hash_cache)
+        if cache_record is not None:
+            # Recorded as each source is placed, so a failing prompt can't drop them
+            new_hash_cache[v2_entry["source_file"]] = cache_record
+        return key, v2_entry
+
+    # Per-prompt work is independent and IO-bound; threads overlap the reads/writes
+    executor = None
+    if len(plan) > 1:
+        max_workers = io_worker_count(len(plan))
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        results = executor.map(run, plan) if executor else map(run, plan)
+        v2_prompts.update(results)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        # Saved before _meta.json moves to schema 2, even if a prompt failed: an
+        # interrupted run stays at schema 1, and its retry reuses these hashes
+        save_hash_cache(prompts_root, new_hash_cache)
 
     # Write v2 metadata
     v2_data = {"schema": 2, "prompts": v2_prompts}
-    with open(meta_path, "w", encoding="utf-8") as f:
-        json.dump(v2_data, f, indent=2)
-        f.write("\n")
+    atomic_write_bytes(meta_path, dumps_json(v2_data))
 
     if interactive:
         print(f"Migration complete! Updated {meta_path}")
@@ -223,6 +335,7 @@ def migrate(
     to_version: int,
     prompts_dir: Path | None = None,
     interactive: bool = True,
+    on_conflict: OnConflict = "use-existing",
 ) -> dict:
     """Migrate schema between versions.
 
@@ -232,13 +345,21 @@ def migrate(
         to_version: Target schema version (e.g., 2)
         prompts_dir: Directory for source files (default: <repo-root>/prompts)
         interactive: If True, prompt user for input; if False, auto-create source files
+        on_conflict: When not interactive and a source file already exists, keep it
+            ("use-existing"), replace it with the latest version ("overwrite"), or
+            leave that prompt out of the migration ("skip")
 
     Returns:
-        dict with migration results: {"migrated": int, "backup_path": Path | None, "source_dir": Path}
+        dict with migration results:
+        {"migrated": int, "backup_path": Path | None, "source_dir": Path}
 
     Raises:
         ValueError: If migration path not supported
     """
+    if on_conflict not in ON_CONFLICT_CHOICES:
+        raise ValueError(
+            f"Invalid on_conflict {on_conflict!r}; expected one of {', '.join(ON_CONFLICT_CHOICES)}"
+        )
     if from_version == 1 and to_version == 2:
-        return _migrate_v1_to_v2(repo_root, prompts_dir, interactive)
+        return _migrate_v1_to_v2(repo_root, prompts_dir, interactive, on_conflict)
     raise ValueError(f"Migration from v{from_version} to v{to_version} not supported")
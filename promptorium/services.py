@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from collections.abc import Sequence
+from collections.abc import Iterable, Sequence
 from pathlib import Path
 from typing import Literal, overload
 
@@ -15,7 +15,6 @@ from .domain import (
     SyncResult,
 )
 from .storage.base import StoragePort
-from .util.diff import build_inline_diff
 from .util.keygen import generate_unique_key, is_valid_key
 
 
@@ -57,17 +56,17 @@ class PromptService:
         """Update prompt with new content (writes to source file and creates version)."""
         if not content:
             raise NoContentProvided("No prompt text provided.")
-        # Ensure key exists
-        self.s.get_prompt_ref(key)
+        # Storage raises PromptNotFound for unknown keys
         return self.s.write_new_version(key, content)
 
     def sync_prompt(self, key: str, force: bool = False) -> SyncResult:
         """Sync a single prompt from its source file."""
         return self.s.sync_from_source(key, force)
 
-    def sync_all(self) -> list[SyncResult]:
-        """Sync all source-tracked prompts."""
-        return self.s.sync_all_sources()
+    def sync_all(self, keys: Iterable[str] | None = None) -> list[SyncResult]:
+        """Sync all source-tracked prompts, or only ``keys`` when given."""
+        with self.s.batch():
+            return self.s.sync_all_sources(keys)
 
     def untrack_source(self, key: str, keep_versions: bool = True) -> None:
         """Remove source tracking for a prompt."""
@@ -87,14 +86,15 @@ class PromptService:
     def delete_prompt(self, key: str, delete_all: Literal[True]) -> int: ...
 
     def delete_prompt(self, key: str, delete_all: bool = False) -> PromptVersion | int:
-        # Ensure key exists
-        self.s.get_prompt_ref(key)
+        # Storage raises PromptNotFound for unknown keys
         return self.s.delete_all(key) if delete_all else self.s.delete_latest(key)
 
     def load_prompt(self, key: str, version: int | None = None) -> str:
         return self.s.read_version(key, version)
 
     def diff_versions(self, key: str, v1: int, v2: int, *, granularity: str = "word") -> DiffResult:
+        from .util.diff import build_inline_diff  # Deferred: only diffs need difflib
+
         a = self.s.read_version(key, v1)
         b = self.s.read_version(key, v2)
         g = "word" if granularity not in ("word", "char") else granularity
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from collections.abc import Sequence
+from collections.abc import Iterable, Sequence
+from contextlib import AbstractContextManager, nullcontext
 from pathlib import Path
 
 from ..domain import PromptInfo, PromptRef, PromptVersion, SyncResult
@@ -59,8 +60,10 @@ class StoragePort(ABC):
         ...
 
     @abstractmethod
-    def sync_all_sources(self) -> list[SyncResult]:  # pragma: no cover - interface only
-        """Sync all tracked source files."""
+    def sync_all_sources(
+        self, keys: Iterable[str] | None = None
+    ) -> list[SyncResult]:  # pragma: no cover - interface only
+        """Sync all tracked source files (or only ``keys`` when given)."""
         ...
 
     @abstractmethod
@@ -74,3 +77,7 @@ class StoragePort(ABC):
     ) -> None:  # pragma: no cover - interface only
         """Remove tracking for a prompt. Optionally delete version files."""
         ...
+
+    def batch(self) -> AbstractContextManager[None]:
+        """Group several operations; backends may defer durability until the block exits."""
+        return nullcontext()
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
-import hashlib
-import json
-import re
-from collections.abc import Sequence
+import os
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from contextlib import ExitStack, contextmanager
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
+from typing import overload
 
 from ..domain import (
     PromptAlreadyExists,
@@ -17,13 +18,74 @@ from ..domain import (
     SyncResult,
     VersionNotFound,
 )
-from ..util.io_safety import atomic_write_text
+from ..util.formatting import format_synced
+from ..util.hash_cache import (
+    is_racy,
+    load_hash_cache,
+    make_record,
+    save_hash_cache,
+)
+from ..util.hashing import compute_file_hash, compute_hash, hash_matches, is_legacy_hash
+from ..util.io_safety import atomic_copy_file, atomic_write_bytes, fdatasync, io_worker_count
+from ..util.jsonio import dumps_json, loads_json
+from ..util.version_names import custom_version_re, default_version_number
 from .base import StoragePort
 
 _SCHEMA_VERSION = 2
 
 
-@dataclass
+# (stat, hash) of a source file; hash is None when the hash cache proves it unchanged
+# and _CHANGED when its size alone proves it changed
+_Probe = tuple[os.stat_result, str | None]
+_CHANGED = ""
+
+# (st_mtime_ns, {(key, managed_by_root): versions}) for one version dir; custom dirs
+# can be shared between keys, so each key's listing is kept separately
+_DirListings = tuple[int, dict[tuple[str, bool], list[tuple[int, Path]]]]
+
+
+class _LazyVersions(Sequence[PromptVersion]):
+    """A prompt's versions, scanned from disk the first time they are accessed.
+
+    Lets ``list_prompts`` stay O(keys) for callers that only need refs.
+    """
+
+    __slots__ = ("_scan", "_items")
+
+    def __init__(self, scan: Callable[[], list[PromptVersion]]):
+        self._scan = scan
+        self._items: list[PromptVersion] | None = None
+
+    def _materialize(self) -> list[PromptVersion]:
+        if self._items is None:
+            self._items = self._scan()
+        return self._items
+
+    @overload
+    def __getitem__(self, index: int) -> PromptVersion: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[PromptVersion]: ...
+
+    def __getitem__(self, index: int | slice) -> PromptVersion | list[PromptVersion]:
+        return self._materialize()[index]
+
+    def __len__(self) -> int:
+        return len(self._materialize())
+
+    def __iter__(self) -> Iterator[PromptVersion]:
+        return iter(self._materialize())
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Sequence):
+            return self._materialize() == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(self._materialize())
+
+
+@dataclass(slots=True)
 class _PromptConfig:
     source_file: str  # relative or absolute path
     version_dir: str  # relative or absolute path
@@ -31,7 +93,7 @@ class _PromptConfig:
     last_version: int
 
 
-@dataclass
+@dataclass(slots=True)
 class _Meta:
     schema: int
     prompts: dict[str, _PromptConfig]
@@ -42,18 +104,65 @@ class FileSystemPromptStorage(StoragePort):
         self.repo_root = repo_root.resolve()
         self.root = self.repo_root / ".prompts"
         self._meta_path = self.root / "_meta.json"
+        # Machine-local {source_file: {size, mtime_ns, hash}} records, shared with the
+        # migration; kept out of _meta.json so checkouts don't churn committed metadata
+        self._hash_cache: dict[str, dict] | None = None
+        self._hash_cache_dirty = False
+        # Stored path string -> resolved Path; repo_root is fixed per instance
+        self._resolved_paths: dict[str, Path] = {}
+        # Inside batch(), version and metadata writes skip fsync until the outermost
+        # block exits; these track what still needs syncing
+        self._batch_depth = 0
+        self._meta_dirty = False
+        self._unsynced_versions: list[Path] = []
+        self._initialized = False
+        self._source_files_cache: tuple[tuple[int, int, int], list[tuple[str, Path]]] | None = None
+        # Last parsed _meta.json payload, keyed like _meta_stat_key()
+        self._meta_cache: tuple[tuple[int, int, int], dict] | None = None
+        # Version listings per version dir, valid while the directory's st_mtime_ns matches
+        self._scan_cache: dict[Path, _DirListings] = {}
 
     # --- helpers ---
-    def _load_meta(self) -> _Meta:
-        if not self._meta_path.exists():
-            return _Meta(schema=_SCHEMA_VERSION, prompts={})
-        data = json.loads(self._meta_path.read_text(encoding="utf-8"))
+    def _meta_stat_key(self) -> tuple[int, int, int] | None:
+        """Identify the current ``_meta.json`` contents without reading it.
+
+        Atomic saves change the inode; mtime and size catch in-place edits by hand.
+        """
+        try:
+            st = os.stat(self._meta_path)
+        except FileNotFoundError:
+            return None
+        return self._stat_key(st)
+
+    @staticmethod
+    def _stat_key(st: os.stat_result) -> tuple[int, int, int]:
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _load_payload(self) -> dict:
+        """Return the parsed ``_meta.json``, re-reading it only when it changed on disk.
+
+        The result is the shared cache entry and must not be mutated.
+        """
+        stat_key = self._meta_stat_key()
+        if stat_key is None:
+            return {"schema": _SCHEMA_VERSION, "prompts": {}}
+        if self._meta_cache is not None and self._meta_cache[0] == stat_key:
+            data = self._meta_cache[1]
+        else:
+            data = loads_json(self._meta_path.read_bytes())
+            self._meta_cache = (stat_key, data)
         schema = int(data.get("schema", 0))
         if schema != _SCHEMA_VERSION:
             raise ValueError(
                 f"Unsupported schema version {schema}. Expected {_SCHEMA_VERSION}. "
                 "Run the migration script to upgrade."
             )
+        return data
+
+    def _load_meta(self) -> _Meta:
+        """Load metadata as fresh config objects that callers may mutate."""
+        data = self._load_payload()
+        schema = int(data["schema"])
         prompts: dict[str, _PromptConfig] = {}
         for key, cfg in data.get("prompts", {}).items():
             prompts[key] = _PromptConfig(
@@ -74,63 +183,179 @@ class FileSystemPromptStorage(StoragePort):
                 "last_version": cfg.last_version,
             }
         payload = {"schema": meta.schema, "prompts": prompts_data}
-        atomic_write_text(self._meta_path, json.dumps(payload, indent=2) + "\n")
+        deferred = self._batch_depth > 0
+        st = atomic_write_bytes(self._meta_path, dumps_json(payload), fsync=not deferred)
+        self._meta_cache = (self._stat_key(st), payload)
+        self._meta_dirty = self._meta_dirty or deferred
+
+    @staticmethod
+    def _fsync_path(path: Path) -> None:
+        # A read-only descriptor is enough to sync, and works on read-only files
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            fdatasync(fd)
+        finally:
+            os.close(fd)
+
+    def flush(self) -> None:
+        """Fsync whatever batched writes left unsynced: versions first, then metadata."""
+        while self._unsynced_versions:
+            path = self._unsynced_versions.pop()
+            try:
+                self._fsync_path(path)
+            except FileNotFoundError:
+                pass  # Deleted later in the same batch
+        if self._meta_dirty:
+            self._fsync_path(self._meta_path)
+            self._meta_dirty = False
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Defer fsync of version files and ``_meta.json`` until the outermost block exits."""
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self.flush()
+
+    def _load_hash_cache(self) -> dict[str, dict]:
+        if self._hash_cache is None:
+            self._hash_cache = load_hash_cache(self.root)
+        return self._hash_cache
+
+    def _remember_hash(self, source_file: str, st: os.stat_result, content_hash: str) -> None:
+        """Record that ``source_file`` with this size and mtime hashes to ``content_hash``."""
+        record = make_record(st, content_hash)
+        if record is None:
+            return  # Too recent to trust; see util.hash_cache.is_racy
+        cache = self._load_hash_cache()
+        if cache.get(source_file) != record:
+            cache[source_file] = record
+            self._hash_cache_dirty = True
+
+    def _save_hash_cache(self) -> None:
+        if not self._hash_cache_dirty or self._hash_cache is None:
+            return
+        save_hash_cache(self.root, self._hash_cache)
+        self._hash_cache_dirty = False
 
     def _resolve_path(self, value: str) -> Path:
-        """Resolve a stored path to an absolute path."""
-        p = Path(value)
-        if p.is_absolute():
-            return p
-        return (self.repo_root / p).resolve()
+        """Resolve a stored path to an absolute path (memoized per stored string)."""
+        resolved = self._resolved_paths.get(value)
+        if resolved is None:
+            p = Path(value)
+            resolved = p if p.is_absolute() else (self.repo_root / p).resolve()
+            self._resolved_paths[value] = resolved
+        return resolved
 
     def _store_path(self, path: Path) -> str:
         """Store a path as relative if possible, otherwise absolute."""
-        try:
-            rel = path.resolve().relative_to(self.repo_root)
-            return rel.as_posix()
-        except ValueError:
-            return str(path.resolve())
+        resolved = path.resolve()
+        if resolved.is_relative_to(self.repo_root):
+            return resolved.relative_to(self.repo_root).as_posix()
+        return str(resolved)
+
+    def _ref_from_config(self, key: str, cfg: _PromptConfig) -> PromptRef:
+        ver_dir = self._resolve_path(cfg.version_dir)
+        return PromptRef(
+            key=key,
+            source_file=self._resolve_path(cfg.source_file),
+            version_dir=ver_dir,
+            managed_by_root=self._is_managed_by_root(ver_dir),
+        )
 
     def _default_version_dir(self, key: str) -> Path:
         return self.root / key
 
     def _is_managed_by_root(self, version_dir: Path) -> bool:
-        try:
-            version_dir.resolve().relative_to(self.root)
-            return True
-        except ValueError:
-            return False
+        """Return True if ``version_dir`` (already resolved) lives under ``.prompts``.
 
-    def _compute_hash(self, content: str) -> str:
-        """Compute SHA256 hash of content."""
-        return f"sha256:{hashlib.sha256(content.encode('utf-8')).hexdigest()}"
+        A lexical check; callers pass resolved paths, so no ``realpath`` is needed.
+        """
+        return version_dir.is_relative_to(self.root)
 
     def _scan_versions(
         self, key: str, version_dir: Path, managed_by_root: bool
     ) -> list[tuple[int, Path]]:
-        """Scan a directory for version files."""
-        if not version_dir.exists():
+        """Scan a directory for version files.
+
+        Listings are cached per key until the directory's mtime changes; our own writes
+        and deletes drop the directory's entries via :meth:`_invalidate_scan`.
+        """
+        try:
+            mtime_ns = os.stat(version_dir).st_mtime_ns
+        except FileNotFoundError:
             return []
+        cached = self._scan_cache.get(version_dir)
+        if cached is None or cached[0] != mtime_ns:
+            cached = (mtime_ns, {})
+        listing = cached[1].get((key, managed_by_root))
+        if listing is not None:
+            return list(listing)
         versions: list[tuple[int, Path]] = []
-        if managed_by_root:
-            # Default: <version_dir>/<n>.md
-            for p in version_dir.iterdir():
-                if p.is_file() and re.fullmatch(r"\d+\.md", p.name):
-                    n = int(p.stem)
-                    versions.append((n, p))
-        else:
-            # Custom: <version_dir>/<key>-<n>.md
-            pattern = re.compile(rf"^{re.escape(key)}-(\d+)\.md$")
-            for p in version_dir.iterdir():
-                if p.is_file():
-                    m = pattern.fullmatch(p.name)
-                    if m:
-                        n = int(m.group(1))
-                        versions.append((n, p))
+        # scandir entries carry the file type from the directory read itself, so
+        # is_file() needs no extra stat; Paths are only built for matches
+        with os.scandir(version_dir) as it:
+            if managed_by_root:
+                # Default: <version_dir>/<n>.md
+                for entry in it:
+                    n = default_version_number(entry.name)
+                    if n is not None and entry.is_file():
+                        versions.append((n, Path(entry.path)))
+            else:
+                # Custom: <version_dir>/<key>-<n>.md
+                pattern = custom_version_re(key)
+                for entry in it:
+                    m = pattern.fullmatch(entry.name)
+                    if m and entry.is_file():
+                        versions.append((int(m.group(1)), Path(entry.path)))
         versions.sort(key=lambda t: t[0])
-        return versions
-
-    def _next_version(self, key: str, version_dir: Path, managed_by_root: bool) -> int:
+        # A directory this recently modified may change again within the same tick
+        if not is_racy(mtime_ns):
+            cached[1][(key, managed_by_root)] = versions
+            self._scan_cache[version_dir] = cached
+        return list(versions)
+
+    def _invalidate_scan(self, version_dir: Path) -> None:
+        self._scan_cache.pop(version_dir, None)
+
+    def _write_version(self, ref: PromptRef, version: int, data: bytes) -> Path:
+        """Write ``data`` as ``version`` of ``ref`` and return its path."""
+        path = self._version_path(ref.key, version, ref.version_dir, ref.managed_by_root)
+        deferred = self._batch_depth > 0
+        atomic_write_bytes(path, data, fsync=not deferred)
+        if deferred:
+            self._unsynced_versions.append(path)
+        self._invalidate_scan(ref.version_dir)
+        return path
+
+    def _copy_version(self, ref: PromptRef, version: int) -> str:
+        """Copy ``ref``'s source file in as ``version`` and return the copy's hash."""
+        path = self._version_path(ref.key, version, ref.version_dir, ref.managed_by_root)
+        deferred = self._batch_depth > 0
+        try:
+            atomic_copy_file(ref.source_file, path, fsync=not deferred)
+        except FileNotFoundError:
+            # Deleted since it was probed
+            raise SourceFileNotFound(f"Source file not found: {ref.source_file}") from None
+        if deferred:
+            self._unsynced_versions.append(path)
+        self._invalidate_scan(ref.version_dir)
+        return compute_file_hash(path)
+
+    def _next_version(
+        self, key: str, version_dir: Path, managed_by_root: bool, last_version: int = 0
+    ) -> int:
+        """Return the next version number for ``key``, trusting ``last_version`` when set.
+
+        A stray file in the way falls back to a directory scan.
+        """
+        if last_version > 0:
+            candidate = last_version + 1
+            if not self._version_path(key, candidate, version_dir, managed_by_root).exists():
+                return candidate
         pairs = self._scan_versions(key, version_dir, managed_by_root)
         return (pairs[-1][0] + 1) if pairs else 1
 
@@ -143,16 +368,19 @@ class FileSystemPromptStorage(StoragePort):
 
     # --- API ---
     def ensure_initialized(self) -> None:
+        """Create ``.prompts/_meta.json`` if needed; a no-op after the first call."""
+        if self._initialized:
+            return
         self.root.mkdir(parents=True, exist_ok=True)
         if not self._meta_path.exists():
             self._save_meta(_Meta(schema=_SCHEMA_VERSION, prompts={}))
+        self._initialized = True
 
     def key_exists(self, key: str) -> bool:
-        meta = self._load_meta()
-        return key in meta.prompts
+        # A lookup in the cached payload, without building every prompt's config
+        return key in self._load_payload().get("prompts", {})
 
     def track_source(self, key: str, source_file: Path, version_dir: Path | None) -> PromptRef:
-        self.ensure_initialized()
         meta = self._load_meta()
 
         if key in meta.prompts:
@@ -169,23 +397,26 @@ class FileSystemPromptStorage(StoragePort):
 
         # Resolve version directory
         if version_dir is None:
-            ver_dir = self._default_version_dir(key)
+            ver_dir = self._default_version_dir(key).resolve()
         else:
             ver_dir = (
                 (self.repo_root / version_dir).resolve()
                 if not version_dir.is_absolute()
                 else version_dir.resolve()
             )
-        ver_dir.mkdir(parents=True, exist_ok=True)
-
         managed_by_root = self._is_managed_by_root(ver_dir)
+        try:
+            ver_dir.mkdir(parents=True)
+            next_ver = 1  # We just created the directory, so there is nothing to scan
+        except FileExistsError:
+            # Re-tracking over kept versions (or a shared custom dir) continues numbering
+            next_ver = self._next_version(key, ver_dir, managed_by_root)
 
-        # Read source content and create initial version
-        content = source_path.read_text(encoding="utf-8")
-        content_hash = self._compute_hash(content)
-        next_ver = self._next_version(key, ver_dir, managed_by_root)
+        # Copy the source bytes as-is into the initial version
         version_path = self._version_path(key, next_ver, ver_dir, managed_by_root)
-        atomic_write_text(version_path, content)
+        atomic_copy_file(source_path, version_path)
+        content_hash = compute_file_hash(version_path)
+        self._invalidate_scan(ver_dir)
 
         # Save metadata
         meta.prompts[key] = _PromptConfig(
@@ -203,72 +434,65 @@ class FileSystemPromptStorage(StoragePort):
             managed_by_root=managed_by_root,
         )
 
-    def get_prompt_ref(self, key: str) -> PromptRef:
+    def _get_ref_and_meta(self, key: str) -> tuple[PromptRef, _Meta]:
+        """Load metadata once and return ``key``'s ref with it, for read-modify-write."""
         meta = self._load_meta()
         if key not in meta.prompts:
             raise PromptNotFound(key)
-        cfg = meta.prompts[key]
-        source_path = self._resolve_path(cfg.source_file)
-        ver_dir = self._resolve_path(cfg.version_dir)
-        return PromptRef(
-            key=key,
-            source_file=source_path,
-            version_dir=ver_dir,
-            managed_by_root=self._is_managed_by_root(ver_dir),
-        )
+        return self._ref_from_config(key, meta.prompts[key]), meta
+
+    def get_prompt_ref(self, key: str) -> PromptRef:
+        return self._get_ref_and_meta(key)[0]
 
     def list_prompts(self) -> Sequence[PromptInfo]:
-        self.ensure_initialized()
         meta = self._load_meta()
 
         infos: list[PromptInfo] = []
         for key in sorted(meta.prompts.keys()):
-            cfg = meta.prompts[key]
-            source_path = self._resolve_path(cfg.source_file)
-            ver_dir = self._resolve_path(cfg.version_dir)
-            managed_by_root = self._is_managed_by_root(ver_dir)
-            ref = PromptRef(
-                key=key,
-                source_file=source_path,
-                version_dir=ver_dir,
-                managed_by_root=managed_by_root,
-            )
-            pairs = self._scan_versions(key, ver_dir, managed_by_root)
-            versions = [PromptVersion(key=key, version=n, path=path) for n, path in pairs]
-            infos.append(PromptInfo(ref=ref, versions=versions))
+            ref = self._ref_from_config(key, meta.prompts[key])
+            infos.append(PromptInfo(ref=ref, versions=_LazyVersions(self._version_scanner(ref))))
         return infos
 
+    def _version_scanner(self, ref: PromptRef) -> Callable[[], list[PromptVersion]]:
+        def scan() -> list[PromptVersion]:
+            pairs = self._scan_versions(ref.key, ref.version_dir, ref.managed_by_root)
+            return [PromptVersion(key=ref.key, version=n, path=path) for n, path in pairs]
+
+        return scan
+
     def write_new_version(self, key: str, content: str) -> PromptVersion:
         """Write a new version from provided content (updates source file too)."""
-        ref = self.get_prompt_ref(key)
-        meta = self._load_meta()
+        ref, meta = self._get_ref_and_meta(key)
         cfg = meta.prompts[key]
 
+        # Encode once and reuse the buffer for both writes and the hash
+        data = content.encode("utf-8")
+
         # Write to source file
-        atomic_write_text(ref.source_file, content)
+        atomic_write_bytes(ref.source_file, data)
 
         # Create new version
-        next_ver = self._next_version(key, ref.version_dir, ref.managed_by_root)
-        version_path = self._version_path(key, next_ver, ref.version_dir, ref.managed_by_root)
-        atomic_write_text(version_path, content)
+        content_hash = compute_hash(data)
+        next_ver = self._next_version(key, ref.version_dir, ref.managed_by_root, cfg.last_version)
+        version_path = self._write_version(ref, next_ver, data)
 
         # Update metadata
-        cfg.last_hash = self._compute_hash(content)
+        cfg.last_hash = content_hash
         cfg.last_version = next_ver
         self._save_meta(meta)
 
         return PromptVersion(key=key, version=next_ver, path=version_path)
 
     def delete_latest(self, key: str) -> PromptVersion:
-        ref = self.get_prompt_ref(key)
+        ref, meta = self._get_ref_and_meta(key)
         pairs = self._scan_versions(key, ref.version_dir, ref.managed_by_root)
         if not pairs:
             raise VersionNotFound(f"No versions for key: {key}")
         ver, path = pairs[-1]
         path.unlink(missing_ok=False)
+        self._invalidate_scan(ref.version_dir)
 
         # Update last_version in metadata
-        meta = self._load_meta()
         if pairs[:-1]:
             meta.prompts[key].last_version = pairs[-2][0]
         else:
@@ -278,10 +502,12 @@ class FileSystemPromptStorage(StoragePort):
         return PromptVersion(key=key, version=ver, path=path)
 
     def delete_all(self, key: str) -> int:
-        ref = self.get_prompt_ref(key)
+        ref, meta = self._get_ref_and_meta(key)
         pairs = self._scan_versions(key, ref.version_dir, ref.managed_by_root)
         for _, p in pairs:
-            p.unlink(missing_ok=False)
+            # os.unlink skips Path.unlink's missing_ok wrapper; still raises if gone
+            os.unlink(p)
+        self._invalidate_scan(ref.version_dir)
         # Try to remove directory if managed by root
         if ref.managed_by_root:
             try:
@@ -289,7 +515,6 @@ class FileSystemPromptStorage(StoragePort):
             except OSError:
                 pass
         # Remove from metadata
-        meta = self._load_meta()
         del meta.prompts[key]
         self._save_meta(meta)
         return len(pairs)
@@ -308,73 +533,182 @@ class FileSystemPromptStorage(StoragePort):
                 return path.read_text(encoding="utf-8")
         raise VersionNotFound(f"Version {version} not found for key: {key}")
 
-    def sync_from_source(self, key: str, force: bool = False) -> SyncResult:
-        ref = self.get_prompt_ref(key)
-        meta = self._load_meta()
-        cfg = meta.prompts[key]
+    @staticmethod
+    def _hash_unchanged(stored: str | None, current: str, source_file: Path) -> bool:
+        if stored == current:
+            return True
+        if is_legacy_hash(stored):
+            # Older releases hashed the decoded text, so compare it the same way
+            return hash_matches(stored, source_file.read_text(encoding="utf-8").encode("utf-8"))
+        return False
 
-        if not ref.source_file.exists():
-            raise SourceFileNotFound(f"Source file not found: {ref.source_file}")
+    def _stat_unchanged(self, path: Path, st: os.stat_result) -> bool:
+        try:
+            return self._stat_key(os.stat(path)) == self._stat_key(st)
+        except OSError:
+            return False
 
-        content = ref.source_file.read_text(encoding="utf-8")
-        current_hash = self._compute_hash(content)
+    def _probe_source(self, cfg: _PromptConfig, source_file: Path, force: bool) -> _Probe:
+        """Stat and hash a source file (see ``_Probe``) without touching metadata.
 
-        if not force and current_hash == cfg.last_hash:
-            return SyncResult(
-                key=key,
-                changed=False,
-                old_version=cfg.last_version,
-                new_version=None,
-                message=f"No changes detected for '{key}'",
-            )
+        Only reads shared state, so it is safe to run in threads.
+        """
+        try:
+            st = os.stat(source_file)
+            cached = self._load_hash_cache().get(cfg.source_file)
+            if cached is not None and cached.get("hash") == cfg.last_hash:
+                same_size = cached.get("size") == st.st_size
+                if not force and same_size and cached.get("mtime_ns") == st.st_mtime_ns:
+                    return st, None  # Same size and mtime as when last_hash was confirmed
+                if not same_size:
+                    return st, _CHANGED  # Content of another size can't hash to last_hash
+            return st, compute_file_hash(source_file)
+        except FileNotFoundError:
+            raise SourceFileNotFound(f"Source file not found: {source_file}") from None
+
+    def _sync_one(
+        self,
+        meta: _Meta,
+        key: str,
+        force: bool,
+        probe: _Probe | None = None,
+    ) -> tuple[SyncResult, bool]:
+        """Sync ``key`` against ``meta`` in memory; the caller persists ``meta``.
+
+        ``probe`` is a precomputed :meth:`_probe_source` result. Also returns whether
+        ``meta`` was modified.
+        """
+        cfg = meta.prompts[key]
+        ref = self._ref_from_config(key, cfg)
+
+        # Hash the raw file first; the content is only read if it actually changed
+        st, current_hash = probe or self._probe_source(cfg, ref.source_file, force)
+        unchanged = SyncResult(
+            key=key,
+            changed=False,
+            old_version=cfg.last_version,
+            new_version=None,
+            message=f"No changes detected for '{key}'",
+        )
+        if current_hash is None:
+            return unchanged, False
+
+        if (
+            current_hash != _CHANGED
+            and not force
+            and self._hash_unchanged(cfg.last_hash, current_hash, ref.source_file)
+        ):
+            upgraded = cfg.last_hash != current_hash
+            if upgraded:
+                # Upgrade sha256 hashes from older releases on first successful compare
+                cfg.last_hash = current_hash
+            self._remember_hash(cfg.source_file, st, current_hash)
+            return unchanged, upgraded
 
         old_version = cfg.last_version
-        next_ver = self._next_version(key, ref.version_dir, ref.managed_by_root)
-        version_path = self._version_path(key, next_ver, ref.version_dir, ref.managed_by_root)
-        atomic_write_text(version_path, content)
+        next_ver = self._next_version(key, ref.version_dir, ref.managed_by_root, cfg.last_version)
+        content_hash = self._copy_version(ref, next_ver)
 
-        cfg.last_hash = current_hash
+        cfg.last_hash = content_hash
         cfg.last_version = next_ver
-        self._save_meta(meta)
+        if content_hash == current_hash or (
+            current_hash == _CHANGED and self._stat_unchanged(ref.source_file, st)
+        ):
+            # The stored copy is known to be the source as of ``st``
+            self._remember_hash(cfg.source_file, st, content_hash)
 
-        return SyncResult(
+        result = SyncResult(
             key=key,
             changed=True,
             old_version=old_version,
             new_version=next_ver,
-            message=f"Synced '{key}': v{old_version} -> v{next_ver}",
+            message=format_synced(key, old_version, next_ver),
         )
+        return result, True
 
-    def sync_all_sources(self) -> list[SyncResult]:
+    def sync_from_source(self, key: str, force: bool = False) -> SyncResult:
+        meta = self._load_meta()
+        if key not in meta.prompts:
+            raise PromptNotFound(key)
+        try:
+            result, dirty = self._sync_one(meta, key, force)
+            if dirty:
+                self._save_meta(meta)
+        finally:
+            self._save_hash_cache()
+        return result
+
+    def _start_probes(
+        self, meta: _Meta, keys: Sequence[str], stack: ExitStack
+    ) -> list[Callable[[], _Probe]]:
+        """Return a deferred :meth:`_probe_source` for each key, in order.
+
+        Several keys are probed in parallel on a thread pool owned by ``stack``.
+        """
+        calls = [
+            partial(self._probe_source, cfg, self._resolve_path(cfg.source_file), False)
+            for cfg in (meta.prompts[k] for k in keys)
+        ]
+        if len(calls) < 2:
+            return list(calls)
+        from concurrent.futures import ThreadPoolExecutor  # Deferred: imports logging
+
+        max_workers = io_worker_count(len(calls))
+        pool = stack.enter_context(ThreadPoolExecutor(max_workers=max_workers))
+        return [pool.submit(call).result for call in calls]
+
+    def sync_all_sources(self, keys: Iterable[str] | None = None) -> list[SyncResult]:
+        # Load metadata once, sync every key in memory and save once at the end
         meta = self._load_meta()
+        selected = meta.prompts.keys() if keys is None else set(keys)
+        sync_keys = [k for k in meta.prompts if k in selected]
+        self._load_hash_cache()  # Load before probing so worker threads only read it
+
         results: list[SyncResult] = []
-        for key in meta.prompts:
+        dirty = False
+        with ExitStack() as stack:
+            probes = self._start_probes(meta, sync_keys, stack)
             try:
-                result = self.sync_from_source(key)
-                results.append(result)
-            except SourceFileNotFound as e:
-                results.append(
-                    SyncResult(
-                        key=key,
-                        changed=False,
-                        old_version=None,
-                        new_version=None,
-                        message=str(e),
-                    )
-                )
+                for key, probe in zip(sync_keys, probes, strict=True):
+                    try:
+                        result, changed = self._sync_one(meta, key, force=False, probe=probe())
+                        dirty = dirty or changed
+                        results.append(result)
+                    except SourceFileNotFound as e:
+                        results.append(
+                            SyncResult(
+                                key=key,
+                                changed=False,
+                                old_version=None,
+                                new_version=None,
+                                message=str(e),
+                            )
+                        )
+            finally:
+                # Persist whatever was synced, even if a later key failed
+                if dirty:
+                    self._save_meta(meta)
+                self._save_hash_cache()
         return results
 
     def list_source_files(self) -> list[tuple[str, Path]]:
+        stat_key = self._meta_stat_key()
+        cached = self._source_files_cache
+        if stat_key is not None and cached is not None and cached[0] == stat_key:
+            return list(cached[1])
         meta = self._load_meta()
-        return [(key, self._resolve_path(cfg.source_file)) for key, cfg in meta.prompts.items()]
+        files = [(key, self._resolve_path(cfg.source_file)) for key, cfg in meta.prompts.items()]
+        if stat_key is not None:
+            self._source_files_cache = (stat_key, files)
+        return list(files)
 
     def untrack(self, key: str, keep_versions: bool = True) -> None:
-        if not self.key_exists(key):
-            raise PromptNotFound(key)
-
         if not keep_versions:
-            self.delete_all(key)
-        else:
-            meta = self._load_meta()
-            del meta.prompts[key]
-            self._save_meta(meta)
+            self.delete_all(key)  # Raises PromptNotFound for unknown keys
+            return
+
+        meta = self._load_meta()
+        if key not in meta.prompts:
+            raise PromptNotFound(key)
+        del meta.prompts[key]
+        self._save_meta(meta)
@@ -2,17 +2,23 @@ from __future__ import annotations
 
 import re
 from collections.abc import Iterable, Sequence
-from difflib import SequenceMatcher
 
 from ..domain import DiffSegment
 
+try:
+    # C port of difflib.SequenceMatcher with identical opcodes (speedups extra)
+    from cdifflib import CSequenceMatcher as SequenceMatcher
+except ImportError:
+    from difflib import SequenceMatcher
+
+# Word granularity keeps whitespace and punctuation as separate tokens to preserve layout
+_WORD_TOKEN_RE = re.compile(r"\s+|\w+|[^\w\s]", flags=re.UNICODE)
+
 
 def _tokenize(text: str, *, granularity: str) -> list[str]:
     if granularity == "char":
         return list(text)
-    # word granularity: keep whitespace and punctuation as separate tokens to preserve layout
-    pattern = re.compile(r"\s+|\w+|[^\w\s]", flags=re.UNICODE)
-    return [m.group(0) for m in pattern.finditer(text)]
+    return _WORD_TOKEN_RE.findall(text)
 
 
 def _coalesce(op: str, tokens: Iterable[str]) -> str:
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import io
+from collections.abc import Iterable
+
+from ..domain import DiffResult, PromptInfo, SyncResult
+
+# (prefix, suffix) wrapped around each segment's text in plain-text diffs
+_DIFF_MARKERS: dict[str, tuple[str, str]] = {
+    "equal": ("", ""),
+    "insert": ("[+", "]"),
+    "delete": ("[-", "]"),
+}
+
+
+def format_synced(key: str, old_version: int | None, new_version: int | None) -> str:
+    """The one-line report for a sync that created a version."""
+    return f"Synced '{key}': v{old_version} -> v{new_version}"
+
+
+def format_no_changes(key: str, version: int | None) -> str:
+    """The one-line report for a single-key sync that found nothing to do."""
+    return f"No changes for '{key}' (at v{version})"
+
+
+def format_sync_results(results: Iterable[SyncResult]) -> str:
+    """Render ``sync_all`` results as one line per prompt, ready to emit in one write."""
+    return "\n".join(
+        format_synced(r.key, r.old_version, r.new_version)
+        if r.changed
+        else f"Unchanged: '{r.key}' (at v{r.old_version})"
+        for r in results
+    )
+
+
+def format_prompt_details(info: PromptInfo) -> list[str]:
+    """Return the indented source/versions lines shown under a prompt's key."""
+    lines = [f"  Source: {info.ref.source_file}", f"  Versions: {info.ref.version_dir}"]
+    lines.extend(f"    - v{v.version}: {v.path}" for v in info.versions)
+    return lines
+
+
+def format_inline_diff(result: DiffResult) -> str:
+    """Render a diff as plain text, marking ``[+inserts]`` and ``[-deletions]``."""
+    buf = io.StringIO()
+    buf.write(f"Diff {result.key} v{result.v1} -> v{result.v2}:\n\n")
+    for seg in result.segments:
+        prefix, suffix = _DIFF_MARKERS[seg.op]
+        buf.write(prefix)
+        buf.write(seg.text)
+        buf.write(suffix)
+    return buf.getvalue()
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+from .io_safety import atomic_write_bytes, atomic_write_text
+from .jsonio import dumps_json, loads_json
+
+HASH_CACHE_NAME = "_meta.cache.json"
+
+# A file changed again within the same mtime tick would look unchanged, so stats
+# this close to "now" are not trusted (cf. git's "racy" index entries)
+RACY_MTIME_NS = 2_000_000_000
+
+
+def is_racy(mtime_ns: int) -> bool:
+    """Return True if ``mtime_ns`` is too recent to prove a file hasn't changed since."""
+    return time.time_ns() - mtime_ns <= RACY_MTIME_NS
+
+
+def make_record(st: os.stat_result, content_hash: str) -> dict | None:
+    """Return the cache record for a file with stat ``st``, or None if ``st`` is racy."""
+    if is_racy(st.st_mtime_ns):
+        return None
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "hash": content_hash}
+
+
+def load_hash_cache(prompts_root: Path) -> dict[str, dict]:
+    """Load the ``{source_str: {size, mtime_ns, hash}}`` sidecar under ``prompts_root``.
+
+    Size and mtime only decide whether the cached hash can be reused; on any
+    mismatch the file is hashed again. A missing or unreadable cache is empty, and
+    records that aren't objects are dropped.
+    """
+    try:
+        data = loads_json((prompts_root / HASH_CACHE_NAME).read_bytes())
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {source: record for source, record in data.items() if isinstance(record, dict)}
+
+
+def save_hash_cache(prompts_root: Path, cache: dict[str, dict]) -> None:
+    """Write the sidecar and make sure ``prompts_root/.gitignore`` lists it.
+
+    The records hold machine-local mtimes, so committing them would churn on
+    every sync. Only a cache: losing it on a crash just means rehashing, so the
+    write skips fsync.
+    """
+    _ensure_ignored(prompts_root / ".gitignore", HASH_CACHE_NAME)
+    atomic_write_bytes(prompts_root / HASH_CACHE_NAME, dumps_json(cache), fsync=False)
+
+
+def _ensure_ignored(ignore: Path, name: str) -> None:
+    try:
+        text = ignore.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        text = ""
+    if name in (line.strip() for line in text.splitlines()):
+        return
+    if text and not text.endswith("\n"):
+        text += "\n"
+    atomic_write_text(ignore, f"{text}{name}\n")
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+from pathlib import Path
+
+import xxhash
+
+_HASH_PREFIX = "xxh3:"
+_LEGACY_HASH_PREFIX = "sha256:"
+_MMAP_THRESHOLD = 1 << 20
+
+
+def compute_hash(data: bytes) -> str:
+    """Return the change-detection hash for ``data`` (``xxh3:<hex>``).
+
+    The hash only detects edits between syncs; it is not a security primitive, so a
+    fast non-cryptographic 128-bit XXH3 digest is used.
+    """
+    return f"{_HASH_PREFIX}{xxhash.xxh3_128_hexdigest(data)}"
+
+
+def compute_file_hash(path: Path) -> str:
+    """Return :func:`compute_hash` of a file's raw bytes without loading it whole.
+
+    Large files are memory-mapped and hashed in place, which is about twice as fast
+    as copying them through a buffer. Smaller ones go through ``hashlib.file_digest``,
+    where mapping costs more than it saves. Nothing is decoded on either path.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size >= _MMAP_THRESHOLD:
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return f"{_HASH_PREFIX}{xxhash.xxh3_128_hexdigest(mm)}"
+            except (OSError, ValueError):
+                pass  # Not mappable (or truncated meanwhile); stream it instead
+        # xxhash's stubs don't declare the ``_HashObject`` protocol it implements
+        digest = hashlib.file_digest(f, xxhash.xxh3_128)  # type: ignore[arg-type]
+    return f"{_HASH_PREFIX}{digest.hexdigest()}"
+
+
+def is_legacy_hash(value: str | None) -> bool:
+    """Return True if ``value`` was written by an older release (``sha256:<hex>``)."""
+    return value is not None and value.startswith(_LEGACY_HASH_PREFIX)
+
+
+def hash_matches(stored: str | None, data: bytes) -> bool:
+    """Return True if ``stored`` is the hash of ``data``.
+
+    Legacy ``sha256:`` values are verified with SHA-256 so existing metadata keeps
+    validating; callers should rewrite them with :func:`compute_hash` on match.
+    """
+    if stored is None:
+        return False
+    if is_legacy_hash(stored):
+        return stored == f"{_LEGACY_HASH_PREFIX}{hashlib.sha256(data).hexdigest()}"
+    return stored == compute_hash(data)
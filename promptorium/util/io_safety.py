@@ -1,8 +1,20 @@
 from __future__ import annotations
 
 import os
+import shutil
 import tempfile
+from collections.abc import Callable
 from pathlib import Path
+from typing import BinaryIO
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None  # type: ignore[assignment]
+
+_FICLONE: int | None = getattr(fcntl, "FICLONE", None)
+_COPY_CHUNK = 1 << 30
+_fdatasync = getattr(os, "fdatasync", os.fsync)
 
 
 def ensure_parent_dir(path: Path) -> None:
@@ -10,20 +22,101 @@ def ensure_parent_dir(path: Path) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
 
 
+def fdatasync(fd: int) -> None:
+    """Flush the contents of ``fd`` to disk.
+
+    Uses ``os.fdatasync`` where available, which skips flushing timestamps but still
+    covers the size and everything else needed to read the data back; elsewhere
+    (e.g. macOS) it falls back to ``os.fsync``.
+    """
+    _fdatasync(fd)
+
+
+def io_worker_count(tasks: int) -> int:
+    """Thread-pool size for ``tasks`` independent file-I/O jobs.
+
+    Threads mostly wait on the disk, so this allows four per CPU (at most 32), but
+    never more threads than jobs.
+    """
+    return min(32, (os.cpu_count() or 1) * 4, tasks)
+
+
 def atomic_write_text(path: Path, content: str, encoding: str = "utf-8") -> None:
     """Atomically write text to ``path``.
 
     Writes to a temporary file in the same directory and then replaces the target.
     """
+    atomic_write_bytes(path, content.encode(encoding))
+
+
+def atomic_write_bytes(path: Path, data: bytes, *, fsync: bool = True) -> os.stat_result:
+    """Atomically write raw bytes to ``path`` (see :func:`atomic_write_text`).
+
+    Returns the stat of the written file, taken before it is moved into place so it
+    cannot pick up a concurrent writer's replacement. ``fsync=False`` keeps the
+    replace atomic for readers but leaves durability to the caller.
+    """
+    return _atomic_write_with(path, lambda tmp: tmp.write(data), fsync)
+
+
+def atomic_copy_file(src: Path, path: Path, *, fsync: bool = True) -> os.stat_result:
+    """Atomically replace ``path`` with a copy of ``src`` (see :func:`atomic_write_bytes`).
+
+    The copy never passes through Python: copy-on-write filesystems (btrfs, XFS)
+    clone the extents with ``FICLONE``, others copy in the kernel with
+    ``copy_file_range``, and a plain buffered copy is the last resort.
+    """
+    with open(src, "rb", buffering=0) as fsrc:
+        return _atomic_write_with(path, lambda tmp: _copy_into(fsrc, tmp), fsync)
+
+
+def _copy_into(fsrc: BinaryIO, fdst: BinaryIO) -> None:
+    src_fd, dst_fd = fsrc.fileno(), fdst.fileno()
+    size = os.fstat(src_fd).st_size
+    # Each fast path is only trusted if the whole file landed: copy_file_range can
+    # report EOF early (e.g. on some special or network filesystems)
+    if _FICLONE is not None:
+        try:
+            fcntl.ioctl(dst_fd, _FICLONE, src_fd)
+            if os.fstat(dst_fd).st_size == size:
+                return
+            _rewind(fsrc, fdst)
+        except OSError:
+            pass  # No reflinks here (or across filesystems)
+    try:
+        while os.copy_file_range(src_fd, dst_fd, _COPY_CHUNK):
+            pass
+        if os.fstat(dst_fd).st_size == size:
+            return
+    except (AttributeError, OSError):
+        pass  # Unsupported here
+    # Start over in case part of the file was already copied
+    _rewind(fsrc, fdst)
+    shutil.copyfileobj(fsrc, fdst)
+
+
+def _rewind(fsrc: BinaryIO, fdst: BinaryIO) -> None:
+    fsrc.seek(0)
+    fdst.seek(0)
+    fdst.truncate()
+
+
+def _atomic_write_with(
+    path: Path, fill: Callable[[BinaryIO], object], fsync: bool
+) -> os.stat_result:
+    """Create a temp file next to ``path``, let ``fill`` write it, then move it into place."""
     ensure_parent_dir(path)
     directory = str(path.parent)
     fd, tmp_name = tempfile.mkstemp(prefix=".tmp_", dir=directory)
     try:
-        with os.fdopen(fd, "w", encoding=encoding) as tmp:
-            tmp.write(content)
+        with os.fdopen(fd, "wb") as tmp:
+            fill(tmp)
             tmp.flush()
-            os.fsync(tmp.fileno())
+            if fsync:
+                fdatasync(tmp.fileno())
+            st = os.fstat(tmp.fileno())
         os.replace(tmp_name, path)
+        return st
     finally:
         # Clean up temp file if something went wrong prior to replace
         try:
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:  # Optional speedup: pip install promptorium-python[speedups]
+    import orjson
+
+    _HAS_ORJSON = True
+except ImportError:  # pragma: no cover - exercised only without orjson installed
+    _HAS_ORJSON = False
+
+
+def loads_json(data: bytes) -> Any:
+    """Parse JSON from raw bytes, using ``orjson`` when it is installed."""
+    if _HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_json(obj: Any) -> bytes:
+    """Serialize ``obj`` as 2-space indented UTF-8 JSON with a trailing newline."""
+    if _HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj, indent=2, ensure_ascii=False) + "\n").encode("utf-8")
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from pathlib import Path
 
 
@@ -23,3 +24,18 @@ def find_repo_root(start: Path | None = None) -> Path:
             return parent
 
     return current
+
+
+@lru_cache(maxsize=16)
+def _find_repo_root_from(start: Path) -> Path:
+    return find_repo_root(start)
+
+
+def find_repo_root_cached() -> Path:
+    """Memoized :func:`find_repo_root` for the current working directory.
+
+    Entry points that run many operations per process (the MCP server, library
+    callers) skip the parent walk after the first lookup. The cache is keyed on the
+    working directory so a ``chdir`` still resolves correctly.
+    """
+    return _find_repo_root_from(Path.cwd())
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+import re
+from functools import cache
+
+
+def default_version_number(name: str) -> int | None:
+    """Return ``n`` for a default-layout version file name ``<n>.md``, else None.
+
+    Plain string checks are enough for this layout; no regex needed.
+    """
+    stem = name[:-3]
+    if name.endswith(".md") and stem.isascii() and stem.isdigit():
+        return int(stem)
+    return None
+
+
+@cache
+def custom_version_re(key: str) -> re.Pattern[str]:
+    """Compiled ``<key>-<n>.md`` pattern for custom version dirs, built once per key."""
+    return re.compile(rf"{re.escape(key)}-(\d+)\.md")
@@ -6,6 +6,7 @@ to the new source-of-truth model (schema v2).
 
 Usage:
     python scripts/migrate_v1_to_v2.py [--repo-root /path/to/repo]
+        [--non-interactive [--on-conflict {use-existing,overwrite,skip}]]
 
 For each existing prompt:
 1. Reads current v1 metadata and version files
@@ -19,13 +20,11 @@ from __future__ import annotations
 import argparse
 from pathlib import Path
 
-from promptorium.migration import migrate
+from promptorium.migration import ON_CONFLICT_CHOICES, migrate
 
 
 def main() -> None:
-    parser = argparse.ArgumentParser(
-        description="Migrate promptorium from v1 to v2 schema"
-    )
+    parser = argparse.ArgumentParser(description="Migrate promptorium from v1 to v2 schema")
     parser.add_argument(
         "--repo-root",
         type=Path,
@@ -38,6 +37,17 @@ def main() -> None:
         default=None,
         help="Directory for source files (default: <repo-root>/prompts)",
     )
+    parser.add_argument(
+        "--non-interactive",
+        action="store_true",
+        help="Don't prompt; resolve existing source files with --on-conflict (for CI)",
+    )
+    parser.add_argument(
+        "--on-conflict",
+        choices=ON_CONFLICT_CHOICES,
+        default="use-existing",
+        help="What to do when a source file already exists (default: use-existing)",
+    )
     args = parser.parse_args()
 
     repo_root = args.repo_root
@@ -51,7 +61,8 @@ def main() -> None:
         from_version=1,
         to_version=2,
         prompts_dir=args.prompts_dir,
-        interactive=True,
+        interactive=not args.non_interactive,
+        on_conflict=args.on_conflict,
     )
 
 
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+_SHM = Path("/dev/shm")
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Root ``tmp_path`` on tmpfs when available.
+
+    The storage tests create many tiny files and fsync each write, so they are bound by
+    metadata latency rather than bandwidth; on tmpfs those syscalls never reach a disk.
+    An explicit ``--basetemp`` or ``PYTEST_DEBUG_TEMPROOT`` still wins, and the variable
+    is inherited by pytest-xdist workers.
+    """
+    if sys.platform == "linux" and _SHM.is_dir() and os.access(_SHM, os.W_OK):
+        os.environ.setdefault("PYTEST_DEBUG_TEMPROOT", str(_SHM))
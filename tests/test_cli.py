@@ -2,253 +2,258 @@ from __future__ import annotations
 
 from pathlib import Path
 
+import pytest
 from typer.testing import CliRunner
 
 from promptorium.cli import app
+from promptorium.services import PromptService
+from promptorium.storage.fs import FileSystemPromptStorage
+from promptorium.util.repo_root import find_repo_root
 
+runner = CliRunner()
 
-def test_cli_track_sync_list_load_delete() -> None:
-    """Test basic CLI workflow: track, sync, list, load, delete."""
-    runner = CliRunner()
-    with runner.isolated_filesystem():
-        # Create source file
-        prompts = Path("prompts")
-        prompts.mkdir(parents=True, exist_ok=True)
-        source = prompts / "onboarding.md"
-        source.write_text("hello v1", encoding="utf-8")
-
-        # Track with custom version dir
-        result = runner.invoke(
-            app, ["track", str(source), "--key", "onboarding", "--version-dir", "versions/system"]
-        )
-        assert result.exit_code == 0
-        assert "Tracking 'onboarding'" in result.stdout
-
-        # List should show the prompt
-        result = runner.invoke(app, ["list"])
-        assert result.exit_code == 0
-        assert "onboarding" in result.stdout
-        assert "Source:" in result.stdout
-
-        # Load should return content
-        result = runner.invoke(app, ["load", "onboarding"])
-        assert result.exit_code == 0
-        assert "hello v1" in result.stdout
-
-        # Modify source and sync
-        source.write_text("hello v2", encoding="utf-8")
-        result = runner.invoke(app, ["sync", "onboarding"])
-        assert result.exit_code == 0
-        assert "Synced 'onboarding'" in result.stdout
-        assert "v1 -> v2" in result.stdout
-
-        # Load v1
-        result = runner.invoke(app, ["load", "onboarding", "--version", "1"])
-        assert result.exit_code == 0
-        assert "hello v1" in result.stdout
-
-        # Load v2
-        result = runner.invoke(app, ["load", "onboarding", "--version", "2"])
-        assert result.exit_code == 0
-        assert "hello v2" in result.stdout
-
-        # Diff
-        result = runner.invoke(app, ["diff", "onboarding", "1", "2"])
-        assert result.exit_code == 0
-
-        # Delete latest
-        result = runner.invoke(app, ["delete", "onboarding"])
-        assert result.exit_code == 0
-
-        # Delete all
-        result = runner.invoke(app, ["delete", "onboarding", "--all"])
-        assert result.exit_code == 0
-
-
-def test_cli_sync_no_changes() -> None:
-    """Test sync when no changes detected."""
-    runner = CliRunner()
-    with runner.isolated_filesystem():
-        source = Path("prompt.md")
-        source.write_text("content", encoding="utf-8")
 
-        runner.invoke(app, ["track", str(source), "--key", "test"])
+@pytest.fixture
+def workspace(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Run the test from an empty per-test directory (the repo root for the CLI)."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
 
-        # Sync without changes
-        result = runner.invoke(app, ["sync", "test"])
-        assert result.exit_code == 0
-        assert "No changes" in result.stdout
 
+@pytest.fixture
+def tracked_prompt(workspace: Path) -> Path:
+    """A ``prompt.md`` containing ``original``, tracked as key ``test``."""
+    source = Path("prompt.md")
+    source.write_text("original", encoding="utf-8")
+    _track(source, "test")
+    return source
 
-def test_cli_sync_all() -> None:
-    """Test sync all prompts."""
-    runner = CliRunner()
-    with runner.isolated_filesystem():
-        source1 = Path("prompt1.md")
-        source2 = Path("prompt2.md")
-        source1.write_text("one", encoding="utf-8")
-        source2.write_text("two", encoding="utf-8")
 
-        runner.invoke(app, ["track", str(source1), "--key", "one"])
-        runner.invoke(app, ["track", str(source2), "--key", "two"])
+def _track(source: Path, key: str) -> None:
+    """Track ``source`` in-process; for setup steps that don't exercise argv parsing."""
+    PromptService(FileSystemPromptStorage(find_repo_root())).track_source(source, key)
 
-        # Modify one
-        source1.write_text("one modified", encoding="utf-8")
-
-        # Sync all
-        result = runner.invoke(app, ["sync"])
-        assert result.exit_code == 0
-        assert "Synced 'one'" in result.stdout
-        assert "Unchanged: 'two'" in result.stdout
 
+def test_cli_track_sync_list_load_delete(workspace: Path) -> None:
+    """Test basic CLI workflow: track, sync, list, load, delete."""
+    # Create source file
+    prompts = Path("prompts")
+    prompts.mkdir(parents=True, exist_ok=True)
+    source = prompts / "onboarding.md"
+    source.write_text("hello v1", encoding="utf-8")
+
+    # Track with custom version dir
+    result = runner.invoke(
+        app, ["track", str(source), "--key", "onboarding", "--version-dir", "versions/system"]
+    )
+    assert result.exit_code == 0
+    assert "Tracking 'onboarding'" in result.stdout
+
+    # List should show the prompt
+    result = runner.invoke(app, ["list"])
+    assert result.exit_code == 0
+    assert "onboarding" in result.stdout
+    assert "Source:" in result.stdout
+
+    # Load should return content
+    result = runner.invoke(app, ["load", "onboarding"])
+    assert result.exit_code == 0
+    assert "hello v1" in result.stdout
+
+    # Modify source and sync
+    source.write_text("hello v2", encoding="utf-8")
+    result = runner.invoke(app, ["sync", "onboarding"])
+    assert result.exit_code == 0
+    assert "Synced 'onboarding'" in result.stdout
+    assert "v1 -> v2" in result.stdout
+
+    # Load v1
+    result = runner.invoke(app, ["load", "onboarding", "--version", "1"])
+    assert result.exit_code == 0
+    assert "hello v1" in result.stdout
+
+    # Load v2
+    result = runner.invoke(app, ["load", "onboarding", "--version", "2"])
+    assert result.exit_code == 0
+    assert "hello v2" in result.stdout
+
+    # Diff
+    result = runner.invoke(app, ["diff", "onboarding", "1", "2"])
+    assert result.exit_code == 0
+
+    # Delete latest
+    result = runner.invoke(app, ["delete", "onboarding"])
+    assert result.exit_code == 0
+
+    # Delete all
+    result = runner.invoke(app, ["delete", "onboarding", "--all"])
+    assert result.exit_code == 0
+
+
+def test_cli_sync_no_changes(tracked_prompt: Path) -> None:
+    """Test sync when no changes detected."""
+    # Sync without changes
+    result = runner.invoke(app, ["sync", "test"])
+    assert result.exit_code == 0
+    assert "No changes" in result.stdout
 
-def test_cli_untrack() -> None:
-    """Test untrack command."""
-    runner = CliRunner()
-    with runner.isolated_filesystem():
-        source = Path("prompt.md")
-        source.write_text("content", encoding="utf-8")
 
-        runner.invoke(app, ["track", str(source), "--key", "test"])
+def test_cli_sync_all(workspace: Path) -> None:
+    """Test sync all prompts."""
+    source1 = Path("prompt1.md")
+    source2 = Path("prompt2.md")
+    source1.write_text("one", encoding="utf-8")
+    source2.write_text("two", encoding="utf-8")
 
-        # Untrack
-        result = runner.invoke(app, ["untrack", "test"])
-        assert result.exit_code == 0
-        assert "Untracked 'test'" in result.stdout
+    _track(source1, "one")
+    _track(source2, "two")
 
-        # List should be empty
-        result = runner.invoke(app, ["list"])
-        assert "No prompts tracked" in result.stdout
+    # Modify one
+    source1.write_text("one modified", encoding="utf-8")
 
+    # Sync all
+    result = runner.invoke(app, ["sync"])
+    assert result.exit_code == 0
+    assert "Synced 'one'" in result.stdout
+    assert "Unchanged: 'two'" in result.stdout
 
-def test_cli_update_via_file() -> None:
-    """Test update command with --file option."""
-    runner = CliRunner()
-    with runner.isolated_filesystem():
-        source = Path("prompt.md")
-        source.write_text("original", encoding="utf-8")
 
-        runner.invoke(app, ["track", str(source), "--key", "test"])
+def test_cli_untrack(tracked_prompt: Path) -> None:
+    """Test untrack command."""
+    # Untrack
+    result = runner.invoke(app, ["untrack", "test"])
+    assert result.exit_code == 0
+    assert "Untracked 'test'" in result.stdout
 
-        # Update via file
-        update_file = Path("update.md")
-        update_file.write_text("updated content", encoding="utf-8")
+    # List should be empty
+    result = runner.invoke(app, ["list"])
+    assert "No prompts tracked" in result.stdout
 
-        result = runner.invoke(app, ["update", "test", "--file", str(update_file)])
-        assert result.exit_code == 0
-        assert "Updated test -> v2" in result.stdout
 
-        # Source file should be updated
-        assert source.read_text() == "updated content"
+def test_cli_update_via_file(tracked_prompt: Path) -> None:
+    """Test update command with --file option."""
+    # Update via file
+    update_file = Path("update.md")
+    update_file.write_text("updated content", encoding="utf-8")
 
+    result = runner.invoke(app, ["update", "test", "--file", str(update_file)])
+    assert result.exit_code == 0
+    assert "Updated test -> v2" in result.stdout
 
-def test_cli_update_via_stdin() -> None:
-    """Test update command via stdin."""
-    runner = CliRunner()
-    with runner.isolated_filesystem():
-        source = Path("prompt.md")
-        source.write_text("original", encoding="utf-8")
+    # Source file should be updated
+    assert tracked_prompt.read_text() == "updated content"
 
-        runner.invoke(app, ["track", str(source), "--key", "test"])
 
-        # Update via stdin
-        result = runner.invoke(app, ["update", "test"], input="stdin content")
-        assert result.exit_code == 0
-        assert "Updated test -> v2" in result.stdout
+def test_cli_update_via_stdin(tracked_prompt: Path) -> None:
+    """Test update command via stdin."""
+    # Update via stdin
+    result = runner.invoke(app, ["update", "test"], input="stdin content")
+    assert result.exit_code == 0
+    assert "Updated test -> v2" in result.stdout
 
-        # Source file should be updated
-        assert source.read_text() == "stdin content"
+    # Source file should be updated
+    assert tracked_prompt.read_text() == "stdin content"
 
 
-def test_cli_update_mutually_exclusive_flags() -> None:
+def test_cli_update_mutually_exclusive_flags(tracked_prompt: Path) -> None:
     """Test that --file and --edit flags are mutually exclusive."""
-    runner = CliRunner()
-    with runner.isolated_filesystem():
-        source = Path("prompt.md")
-        source.write_text("content", encoding="utf-8")
-
-        runner.invoke(app, ["track", str(source), "--key", "alpha"])
-        result = runner.invoke(app, ["update", "alpha", "--file", "f.txt", "--edit"])
-        # EX_USAGE
-        assert result.exit_code == 64
+    result = runner.invoke(app, ["update", "test", "--file", "f.txt", "--edit"])
+    # EX_USAGE
+    assert result.exit_code == 64
 
 
-def test_cli_track_nonexistent_file() -> None:
+def test_cli_track_nonexistent_file(workspace: Path) -> None:
     """Test track with nonexistent file fails."""
-    runner = CliRunner()
-    with runner.isolated_filesystem():
-        result = runner.invoke(app, ["track", "nonexistent.md", "--key", "test"])
-        assert result.exit_code == 1
-        # Error is written to stderr which is mixed into output
-        assert "Source file not found" in result.output
+    result = runner.invoke(app, ["track", "nonexistent.md", "--key", "test"])
+    assert result.exit_code == 1
+    # Error is written to stderr which is mixed into output
+    assert "Source file not found" in result.output
 
 
-def test_cli_track_auto_key() -> None:
+def test_cli_track_auto_key(workspace: Path) -> None:
     """Test track with auto-generated key."""
-    runner = CliRunner()
-    with runner.isolated_filesystem():
-        source = Path("prompt.md")
-        source.write_text("content", encoding="utf-8")
+    source = Path("prompt.md")
+    source.write_text("content", encoding="utf-8")
 
-        result = runner.invoke(app, ["track", str(source)])
-        assert result.exit_code == 0
-        assert "Tracking '" in result.stdout
+    result = runner.invoke(app, ["track", str(source)])
+    assert result.exit_code == 0
+    assert "Tracking '" in result.stdout
 
 
-def test_cli_migrate_no_meta() -> None:
+def test_cli_migrate_no_meta(workspace: Path) -> None:
     """Test migrate when no _meta.json exists."""
-    runner = CliRunner()
-    with runner.isolated_filesystem():
-        result = runner.invoke(app, ["migrate"])
-        assert result.exit_code == 0
-        assert "Migrated 0 prompt(s)" in result.stdout
+    result = runner.invoke(app, ["migrate"])
+    assert result.exit_code == 0
+    assert "Migrated 0 prompt(s)" in result.stdout
 
 
-def test_cli_migrate_v1_to_v2() -> None:
+def test_cli_migrate_v1_to_v2(workspace: Path) -> None:
     """Test migrate from v1 to v2 schema."""
     import json
 
-    runner = CliRunner()
-    with runner.isolated_filesystem():
-        # Create v1 metadata structure
-        prompts_root = Path(".prompts")
-        prompts_root.mkdir()
+    # Create v1 metadata structure
+    prompts_root = Path(".prompts")
+    prompts_root.mkdir()
 
-        # Create v1 _meta.json
-        v1_meta = {"schema": 1, "custom_dirs": {}}
-        (prompts_root / "_meta.json").write_text(json.dumps(v1_meta), encoding="utf-8")
+    # Create v1 _meta.json
+    v1_meta = {"schema": 1, "custom_dirs": {}}
+    (prompts_root / "_meta.json").write_text(json.dumps(v1_meta), encoding="utf-8")
 
-        # Create a prompt with version files
-        prompt_dir = prompts_root / "greeting"
-        prompt_dir.mkdir()
-        (prompt_dir / "1.md").write_text("Hello v1", encoding="utf-8")
-        (prompt_dir / "2.md").write_text("Hello v2", encoding="utf-8")
+    # Create a prompt with version files
+    prompt_dir = prompts_root / "greeting"
+    prompt_dir.mkdir()
+    (prompt_dir / "1.md").write_text("Hello v1", encoding="utf-8")
+    (prompt_dir / "2.md").write_text("Hello v2", encoding="utf-8")
 
-        # Run migration
-        result = runner.invoke(app, ["migrate", "--from", "1", "--to", "2"])
-        assert result.exit_code == 0
-        assert "Migrated 1 prompt(s)" in result.stdout
+    # Run migration
+    result = runner.invoke(app, ["migrate", "--from", "1", "--to", "2"])
+    assert result.exit_code == 0
+    assert "Migrated 1 prompt(s)" in result.stdout
 
-        # Verify v2 metadata
-        with open(prompts_root / "_meta.json", encoding="utf-8") as f:
-            v2_meta = json.load(f)
+    # Verify v2 metadata
+    with open(prompts_root / "_meta.json", encoding="utf-8") as f:
+        v2_meta = json.load(f)
 
-        assert v2_meta["schema"] == 2
-        assert "greeting" in v2_meta["prompts"]
-        assert v2_meta["prompts"]["greeting"]["last_version"] == 2
+    assert v2_meta["schema"] == 2
+    assert "greeting" in v2_meta["prompts"]
+    assert v2_meta["prompts"]["greeting"]["last_version"] == 2
 
-        # Verify source file was created
-        assert Path("prompts/greeting.md").exists()
-        assert Path("prompts/greeting.md").read_text() == "Hello v2"
+    # Verify source file was created
+    assert Path("prompts/greeting.md").exists()
+    assert Path("prompts/greeting.md").read_text() == "Hello v2"
 
-        # Verify backup was created
-        assert (prompts_root / "_meta.json.v1.bak").exists()
+    # Verify backup was created
+    assert (prompts_root / "_meta.json.v1.bak").exists()
 
 
-def test_cli_migrate_unsupported_version() -> None:
+def test_cli_migrate_unsupported_version(workspace: Path) -> None:
     """Test migrate with unsupported version path."""
-    runner = CliRunner()
-    with runner.isolated_filesystem():
-        result = runner.invoke(app, ["migrate", "--from", "2", "--to", "3"])
-        assert result.exit_code == 1
-        assert "not supported" in result.output
+    result = runner.invoke(app, ["migrate", "--from", "2", "--to", "3"])
+    assert result.exit_code == 1
+    assert "not supported" in result.output
+
+
+def test_cli_migrate_non_interactive(workspace: Path) -> None:
+    """Test migrate runs without prompting when --non-interactive is given."""
+    import json
+
+    version_dir = Path(".prompts") / "greeting"
+    version_dir.mkdir(parents=True)
+    Path(".prompts/_meta.json").write_text(json.dumps({"schema": 1}), encoding="utf-8")
+    (version_dir / "1.md").write_text("Hello", encoding="utf-8")
+    source = Path("prompts") / "greeting.md"
+    source.parent.mkdir()
+    source.write_text("stale", encoding="utf-8")
+
+    result = runner.invoke(app, ["migrate", "--non-interactive", "--on-conflict", "overwrite"])
+    assert result.exit_code == 0
+    assert "Migrated 1 prompt(s) from v1 to v2" in result.stdout
+    assert source.read_text(encoding="utf-8") == "Hello"
+
+
+def test_cli_migrate_rejects_unknown_on_conflict(workspace: Path) -> None:
+    """Test an unknown --on-conflict policy is a usage error, before any migration runs."""
+    result = runner.invoke(app, ["migrate", "--non-interactive", "--on-conflict", "replace"])
+    assert result.exit_code == 2
+    assert "'replace' is not one of" in result.output
+    assert not (workspace / "prompts").exists()
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+from promptorium.domain import DiffResult
 from promptorium.util.diff import build_inline_diff
+from promptorium.util.formatting import format_inline_diff
 
 
 def test_build_inline_diff_word() -> None:
@@ -23,3 +25,9 @@ def test_build_inline_diff_char() -> None:
     texts = [s.text for s in segs]
     assert ops == ["equal", "delete", "insert", "equal"]
     assert texts == ["a", "b", "x", "c"]
+
+
+def test_format_inline_diff() -> None:
+    segs = build_inline_diff("hello world", "hello brave new world", granularity="word")
+    result = DiffResult(key="greeting", v1=1, v2=2, segments=segs)
+    assert format_inline_diff(result) == "Diff greeting v1 -> v2:\n\nhello [+brave new ]world"
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from promptorium.util.hashing import compute_file_hash, compute_hash
+
+
+@pytest.mark.parametrize("size", [0, 10, 1 << 20, (1 << 20) + 7])
+def test_compute_file_hash_matches_compute_hash(tmp_path: Path, size: int) -> None:
+    # Covers both the streamed and the memory-mapped path
+    data = bytes(range(256)) * (size // 256) + b"x" * (size % 256)
+    path = tmp_path / "prompt.md"
+    path.write_bytes(data)
+
+    assert compute_file_hash(path) == compute_hash(data)
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import errno
+import json
+import os
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+import promptorium.migration as migration
+from promptorium.migration import migrate
+from promptorium.util.hashing import compute_hash
+
+
+def _write_v1_repo(root: Path) -> Path:
+    prompts_root = root / ".prompts"
+    prompt_dir = prompts_root / "greeting"
+    prompt_dir.mkdir(parents=True)
+    (prompts_root / "_meta.json").write_text(
+        json.dumps({"schema": 1, "custom_dirs": {}}), encoding="utf-8"
+    )
+    (prompt_dir / "1.md").write_text("Hello v1", encoding="utf-8")
+    (prompt_dir / "2.md").write_text("Hello v2", encoding="utf-8")
+    return prompts_root
+
+
+def test_migrate_hashes_existing_source_file(tmp_path: Path) -> None:
+    """Test an existing source file is kept as-is and its own content is hashed."""
+    prompts_root = _write_v1_repo(tmp_path)
+    source = tmp_path / "prompts" / "greeting.md"
+    source.parent.mkdir()
+    source.write_text("edited locally", encoding="utf-8")
+
+    result = migrate(tmp_path, 1, 2, interactive=False)
+    assert result["migrated"] == 1
+
+    meta = json.loads((prompts_root / "_meta.json").read_text(encoding="utf-8"))
+    entry = meta["prompts"]["greeting"]
+    assert source.read_text(encoding="utf-8") == "edited locally"
+    assert entry["last_hash"] == compute_hash(b"edited locally")
+    assert entry["last_version"] == 2
+    assert entry["source_file"] == "prompts/greeting.md"
+    assert entry["version_dir"] == ".prompts/greeting"
+
+
+def test_migrate_custom_dir_versions(tmp_path: Path) -> None:
+    """Test custom-managed versions are discovered and unrelated files ignored."""
+    prompts_root = tmp_path / ".prompts"
+    prompts_root.mkdir()
+    custom = tmp_path / "versions"
+    custom.mkdir()
+    (custom / "onboarding-1.md").write_text("one", encoding="utf-8")
+    (custom / "onboarding-10.md").write_text("ten", encoding="utf-8")
+    (custom / "onboarding-notes.md").write_text("ignored", encoding="utf-8")
+    (custom / "other-3.md").write_text("ignored", encoding="utf-8")
+    (custom / "onboarding-2.md").mkdir()
+    v1_meta = {"schema": 1, "custom_dirs": {"onboarding": "versions", "missing": "nowhere"}}
+    (prompts_root / "_meta.json").write_text(json.dumps(v1_meta), encoding="utf-8")
+
+    result = migrate(tmp_path, 1, 2, interactive=False)
+    assert result["migrated"] == 1
+
+    meta = json.loads((prompts_root / "_meta.json").read_text(encoding="utf-8"))
+    assert meta["prompts"]["onboarding"]["last_version"] == 10
+    assert (tmp_path / "prompts" / "onboarding.md").read_text(encoding="utf-8") == "ten"
+
+
+def test_migrate_retry_reuses_cached_hash(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test a migration retried after failing to write metadata skips re-hashing sources."""
+    prompts_root = _write_v1_repo(tmp_path)
+    source = tmp_path / "prompts" / "greeting.md"
+    source.parent.mkdir()
+    source.write_text("edited locally", encoding="utf-8")
+    os.utime(source, ns=(1_000_000_000, 1_000_000_000))  # Old enough to record
+
+    # The run dies writing the v2 metadata, so _meta.json is still schema 1
+    no_space = OSError(errno.ENOSPC, "No space left on device")
+    monkeypatch.setattr(migration, "atomic_write_bytes", Mock(side_effect=no_space))
+    with pytest.raises(OSError):
+        migrate(tmp_path, 1, 2, interactive=False)
+    assert json.loads((prompts_root / "_meta.json").read_bytes())["schema"] == 1
+    monkeypatch.undo()
+
+    compute_file_hash = Mock(wraps=migration.compute_file_hash)
+    monkeypatch.setattr(migration, "compute_file_hash", compute_file_hash)
+    result = migrate(tmp_path, 1, 2, interactive=False)
+    assert result["migrated"] == 1
+    compute_file_hash.assert_not_called()
+
+    meta = json.loads((prompts_root / "_meta.json").read_text(encoding="utf-8"))
+    assert meta["prompts"]["greeting"]["last_hash"] == compute_hash(b"edited locally")
+
+
+def test_migrate_ignores_malformed_hash_cache(tmp_path: Path) -> None:
+    """Test hand-edited hash-cache records are rehashed instead of aborting the run."""
+    prompts_root = _write_v1_repo(tmp_path)
+    source = tmp_path / "prompts" / "greeting.md"
+    source.parent.mkdir()
+    source.write_text("edited locally", encoding="utf-8")
+    sidecar = {"prompts/greeting.md": {"hash": "xxh3:stale"}, "prompts/other.md": 3}
+    (prompts_root / "_meta.cache.json").write_text(json.dumps(sidecar), encoding="utf-8")
+
+    assert migrate(tmp_path, 1, 2, interactive=False)["migrated"] == 1
+
+    meta = json.loads((prompts_root / "_meta.json").read_text(encoding="utf-8"))
+    assert meta["prompts"]["greeting"]["last_hash"] == compute_hash(b"edited locally")
+
+
+def test_migrate_twice_keeps_v1_backup(tmp_path: Path) -> None:
+    """Test re-running a finished migration does not overwrite the v1 backup."""
+    prompts_root = _write_v1_repo(tmp_path)
+    migrate(tmp_path, 1, 2, interactive=False)
+
+    result = migrate(tmp_path, 1, 2, interactive=False)
+    assert result["migrated"] == 0
+
+    backup = json.loads((prompts_root / "_meta.json.v1.bak").read_text(encoding="utf-8"))
+    assert backup["schema"] == 1
+
+
+def test_migrate_many_prompts_non_interactive(tmp_path: Path) -> None:
+    """Test a non-interactive migration of several prompts migrates each one."""
+    prompts_root = tmp_path / ".prompts"
+    prompts_root.mkdir()
+    (prompts_root / "_meta.json").write_text(json.dumps({"schema": 1}), encoding="utf-8")
+    keys = [f"prompt-{i}" for i in range(8)]
+    for i, key in enumerate(keys):
+        (prompts_root / key).mkdir()
+        for n in range(1, i + 2):
+            (prompts_root / key / f"{n}.md").write_text(f"{key} v{n}", encoding="utf-8")
+
+    result = migrate(tmp_path, 1, 2, interactive=False)
+    assert result["migrated"] == len(keys)
+
+    meta = json.loads((prompts_root / "_meta.json").read_text(encoding="utf-8"))
+    for i, key in enumerate(keys):
+        assert meta["prompts"][key]["last_version"] == i + 1
+        source = tmp_path / "prompts" / f"{key}.md"
+        assert source.read_text(encoding="utf-8") == f"{key} v{i + 1}"
+
+
+@pytest.mark.parametrize(
+    ("on_conflict", "expected_source", "migrated"),
+    [
+        ("use-existing", "edited locally", 1),
+        ("overwrite", "Hello v2", 1),
+        ("skip", "edited locally", 0),
+    ],
+)
+def test_migrate_on_conflict_policies(
+    tmp_path: Path, on_conflict: str, expected_source: str, migrated: int
+) -> None:
+    """Test each non-interactive policy for an already existing source file."""
+    prompts_root = _write_v1_repo(tmp_path)
+    source = tmp_path / "prompts" / "greeting.md"
+    source.parent.mkdir()
+    source.write_text("edited locally", encoding="utf-8")
+
+    result = migrate(tmp_path, 1, 2, interactive=False, on_conflict=on_conflict)  # type: ignore[arg-type]
+    assert result["migrated"] == migrated
+    assert source.read_text(encoding="utf-8") == expected_source
+
+    meta = json.loads((prompts_root / "_meta.json").read_text(encoding="utf-8"))
+    if migrated:
+        assert meta["prompts"]["greeting"]["last_hash"] == compute_hash(expected_source.encode())
+    else:
+        assert meta["prompts"] == {}
+
+
+def test_migrate_rejects_unknown_on_conflict(tmp_path: Path) -> None:
+    """Test an unknown on_conflict policy raises before anything is migrated."""
+    prompts_root = _write_v1_repo(tmp_path)
+    with pytest.raises(ValueError, match="on_conflict"):
+        migrate(tmp_path, 1, 2, interactive=False, on_conflict="merge")  # type: ignore[arg-type]
+    assert not (prompts_root / "_meta.json.v1.bak").exists()
+
+
+def test_migrate_git_ignores_hash_cache(tmp_path: Path) -> None:
+    """Test the migration's hash-cache sidecar is listed in .prompts/.gitignore."""
+    prompts_root = _write_v1_repo(tmp_path)
+    (prompts_root / ".gitignore").write_text("scratch/", encoding="utf-8")
+
+    migrate(tmp_path, 1, 2, interactive=False)
+
+    assert (prompts_root / "_meta.cache.json").exists()
+    ignored = (prompts_root / ".gitignore").read_text(encoding="utf-8").splitlines()
+    assert ignored == ["scratch/", "_meta.cache.json"]
+
+
+def test_migrate_follows_symlinked_version_dirs(tmp_path: Path) -> None:
+    """Test symlinked prompt dirs and version files are migrated, as the storage sees them."""
+    prompts_root = tmp_path / ".prompts"
+    prompts_root.mkdir()
+    (prompts_root / "_meta.json").write_text(json.dumps({"schema": 1}), encoding="utf-8")
+    shared = tmp_path / "shared" / "greeting"
+    shared.mkdir(parents=True)
+    (shared / "1.md").write_text("Hello v1", encoding="utf-8")
+    (tmp_path / "v2.md").write_text("Hello v2", encoding="utf-8")
+    (shared / "2.md").symlink_to(tmp_path / "v2.md")
+    (prompts_root / "greeting").symlink_to(shared, target_is_directory=True)
+
+    result = migrate(tmp_path, 1, 2, interactive=False)
+    assert result["migrated"] == 1
+
+    meta = json.loads((prompts_root / "_meta.json").read_text(encoding="utf-8"))
+    assert meta["prompts"]["greeting"]["last_version"] == 2
+    assert (tmp_path / "prompts" / "greeting.md").read_text(encoding="utf-8") == "Hello v2"
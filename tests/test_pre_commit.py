@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+
+from promptorium.hooks.pre_commit import get_staged_files
+
+
+def _git(repo: Path, *args: str) -> None:
+    subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+
+
+def test_get_staged_files(tmp_path: Path) -> None:
+    """Test staged files are returned as absolute paths under the repo root."""
+    _git(tmp_path, "init", "-q")
+    (tmp_path / "prompts").mkdir()
+    (tmp_path / "prompts" / "alpha.md").write_text("a", encoding="utf-8")
+    (tmp_path / "unstaged.md").write_text("b", encoding="utf-8")
+    _git(tmp_path, "add", "prompts/alpha.md")
+
+    staged = get_staged_files(tmp_path)
+    assert staged == {tmp_path.resolve() / "prompts" / "alpha.md"}
+
+
+def test_get_staged_files_unusual_names(tmp_path: Path) -> None:
+    """Test filenames with spaces, newlines and non-ASCII characters round-trip."""
+    _git(tmp_path, "init", "-q")
+    names = ["with space.md", "new\nline.md", "café.md"]
+    for name in names:
+        (tmp_path / name).write_text("x", encoding="utf-8")
+    _git(tmp_path, "add", *names)
+
+    staged = get_staged_files(tmp_path)
+    assert staged == {tmp_path.resolve() / name for name in names}
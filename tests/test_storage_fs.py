@@ -1,12 +1,29 @@
 from __future__ import annotations
 
+import errno
+import hashlib
+import json
+import os
 from pathlib import Path
+from unittest.mock import Mock, call
 
 import pytest
 
-from promptorium.domain import PromptAlreadyExists, SourceFileNotFound
+import promptorium.storage.fs as fs_module
+import promptorium.util.io_safety as io_safety
+from promptorium.domain import PromptAlreadyExists, PromptNotFound, SourceFileNotFound
 from promptorium.storage.fs import FileSystemPromptStorage
 
+StorageWithSource = tuple[FileSystemPromptStorage, Path]
+
+
+@pytest.fixture
+def storage_with_source(tmp_path: Path) -> StorageWithSource:
+    """An initialized storage rooted at ``tmp_path`` and the path of a (not yet written) source."""
+    s = FileSystemPromptStorage(tmp_path)
+    s.ensure_initialized()
+    return s, tmp_path / "prompt.md"
+
 
 def test_track_and_versioning(tmp_path: Path) -> None:
     """Test tracking a source file and versioning."""
@@ -70,12 +87,9 @@ def test_custom_version_dir_naming(tmp_path: Path) -> None:
     assert [v.version for v in info.versions] == [1, 2]
 
 
-def test_sync_no_change(tmp_path: Path) -> None:
+def test_sync_no_change(storage_with_source: StorageWithSource) -> None:
     """Test that sync doesn't create version when unchanged."""
-    s = FileSystemPromptStorage(tmp_path)
-    s.ensure_initialized()
-
-    source = tmp_path / "prompt.md"
+    s, source = storage_with_source
     source.write_text("content", encoding="utf-8")
     s.track_source("test", source, None)
 
@@ -86,12 +100,9 @@ def test_sync_no_change(tmp_path: Path) -> None:
     assert result.new_version is None
 
 
-def test_sync_force(tmp_path: Path) -> None:
+def test_sync_force(storage_with_source: StorageWithSource) -> None:
     """Test force sync creates version even when unchanged."""
-    s = FileSystemPromptStorage(tmp_path)
-    s.ensure_initialized()
-
-    source = tmp_path / "prompt.md"
+    s, source = storage_with_source
     source.write_text("content", encoding="utf-8")
     s.track_source("test", source, None)
 
@@ -101,12 +112,9 @@ def test_sync_force(tmp_path: Path) -> None:
     assert result.new_version == 2
 
 
-def test_delete_latest_and_all(tmp_path: Path) -> None:
+def test_delete_latest_and_all(tmp_path: Path, storage_with_source: StorageWithSource) -> None:
     """Test deleting versions."""
-    s = FileSystemPromptStorage(tmp_path)
-    s.ensure_initialized()
-
-    source = tmp_path / "prompt.md"
+    s, source = storage_with_source
     source.write_text("a", encoding="utf-8")
     s.track_source("alpha", source, None)
 
@@ -125,12 +133,9 @@ def test_delete_latest_and_all(tmp_path: Path) -> None:
     assert not (tmp_path / ".prompts" / "alpha").exists()
 
 
-def test_untrack_keeps_versions(tmp_path: Path) -> None:
+def test_untrack_keeps_versions(tmp_path: Path, storage_with_source: StorageWithSource) -> None:
     """Test untrack with keep_versions=True."""
-    s = FileSystemPromptStorage(tmp_path)
-    s.ensure_initialized()
-
-    source = tmp_path / "prompt.md"
+    s, source = storage_with_source
     source.write_text("content", encoding="utf-8")
     s.track_source("test", source, None)
 
@@ -143,12 +148,9 @@ def test_untrack_keeps_versions(tmp_path: Path) -> None:
     assert not s.key_exists("test")
 
 
-def test_untrack_deletes_versions(tmp_path: Path) -> None:
+def test_untrack_deletes_versions(tmp_path: Path, storage_with_source: StorageWithSource) -> None:
     """Test untrack with keep_versions=False."""
-    s = FileSystemPromptStorage(tmp_path)
-    s.ensure_initialized()
-
-    source = tmp_path / "prompt.md"
+    s, source = storage_with_source
     source.write_text("content", encoding="utf-8")
     s.track_source("test", source, None)
 
@@ -170,12 +172,9 @@ def test_track_nonexistent_source_file(tmp_path: Path) -> None:
         s.track_source("test", tmp_path / "nonexistent.md", None)
 
 
-def test_track_duplicate_key(tmp_path: Path) -> None:
+def test_track_duplicate_key(storage_with_source: StorageWithSource) -> None:
     """Test tracking with duplicate key raises error."""
-    s = FileSystemPromptStorage(tmp_path)
-    s.ensure_initialized()
-
-    source = tmp_path / "prompt.md"
+    s, source = storage_with_source
     source.write_text("content", encoding="utf-8")
     s.track_source("test", source, None)
 
@@ -183,12 +182,11 @@ def test_track_duplicate_key(tmp_path: Path) -> None:
         s.track_source("test", source, None)
 
 
-def test_write_new_version_updates_source(tmp_path: Path) -> None:
+def test_write_new_version_updates_source(
+    tmp_path: Path, storage_with_source: StorageWithSource
+) -> None:
     """Test write_new_version updates both source file and creates version."""
-    s = FileSystemPromptStorage(tmp_path)
-    s.ensure_initialized()
-
-    source = tmp_path / "prompt.md"
+    s, source = storage_with_source
     source.write_text("original", encoding="utf-8")
     s.track_source("test", source, None)
 
@@ -246,3 +244,400 @@ def test_sync_all_sources(tmp_path: Path) -> None:
     assert changed[0].key == "one"
     assert len(unchanged) == 1
     assert unchanged[0].key == "two"
+
+
+def test_sync_accepts_legacy_sha256_hash(
+    tmp_path: Path, storage_with_source: StorageWithSource
+) -> None:
+    """Test sync treats a matching legacy sha256 hash as unchanged and upgrades it."""
+    s, source = storage_with_source
+    source.write_text("content", encoding="utf-8")
+    s.track_source("test", source, None)
+
+    # Rewrite metadata as an older release would have stored it
+    meta_path = tmp_path / ".prompts" / "_meta.json"
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    legacy = f"sha256:{hashlib.sha256(b'content').hexdigest()}"
+    meta["prompts"]["test"]["last_hash"] = legacy
+    meta_path.write_text(json.dumps(meta), encoding="utf-8")
+
+    result = s.sync_from_source("test")
+    assert result.changed is False
+
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    assert meta["prompts"]["test"]["last_hash"].startswith("xxh3:")
+
+
+def test_sync_all_sources_subset(tmp_path: Path) -> None:
+    """Test sync_all_sources only syncs the requested keys."""
+    s = FileSystemPromptStorage(tmp_path)
+    s.ensure_initialized()
+
+    source1 = tmp_path / "prompt1.md"
+    source2 = tmp_path / "prompt2.md"
+    source1.write_text("one", encoding="utf-8")
+    source2.write_text("two", encoding="utf-8")
+
+    s.track_source("one", source1, None)
+    s.track_source("two", source2, None)
+
+    source1.write_text("one modified", encoding="utf-8")
+    source2.write_text("two modified", encoding="utf-8")
+
+    results = s.sync_all_sources(["two"])
+    assert [(r.key, r.changed) for r in results] == [("two", True)]
+    assert s.read_version("one", None) == "one"
+
+
+def test_list_source_files_sees_metadata_changes(tmp_path: Path) -> None:
+    """Test cached list_source_files is refreshed after metadata changes."""
+    s = FileSystemPromptStorage(tmp_path)
+    s.ensure_initialized()
+
+    source1 = tmp_path / "prompt1.md"
+    source2 = tmp_path / "prompt2.md"
+    source1.write_text("one", encoding="utf-8")
+    source2.write_text("two", encoding="utf-8")
+
+    s.track_source("one", source1, None)
+    assert [k for k, _ in s.list_source_files()] == ["one"]
+    assert [k for k, _ in s.list_source_files()] == ["one"]
+
+    # A second storage instance (e.g. another process) changes the metadata
+    FileSystemPromptStorage(tmp_path).track_source("two", source2, None)
+    assert {k for k, _ in s.list_source_files()} == {"one", "two"}
+
+
+def test_sync_all_sources_saves_metadata_once(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test sync_all_sources persists metadata in a single write."""
+    s = FileSystemPromptStorage(tmp_path)
+    s.ensure_initialized()
+    for name in ("one", "two", "three"):
+        source = tmp_path / f"{name}.md"
+        source.write_text(name, encoding="utf-8")
+        s.track_source(name, source, None)
+        source.write_text(f"{name} modified", encoding="utf-8")
+
+    save = Mock(wraps=s._save_meta)
+    monkeypatch.setattr(s, "_save_meta", save)
+
+    results = s.sync_all_sources()
+    assert all(r.changed for r in results)
+    assert save.call_count == 1
+    assert [v.version for v in s.list_prompts()[0].versions] == [1, 2]
+
+
+def test_metadata_cache_sees_external_edits(
+    tmp_path: Path, storage_with_source: StorageWithSource
+) -> None:
+    """Test cached metadata is re-read after another writer changes it."""
+    s, source = storage_with_source
+    source.write_text("content", encoding="utf-8")
+    s.track_source("test", source, None)
+    assert s.key_exists("test")
+
+    FileSystemPromptStorage(tmp_path).untrack("test")
+    assert not s.key_exists("test")
+
+
+def test_sync_preserves_source_bytes(
+    storage_with_source: StorageWithSource,
+) -> None:
+    """Test versions are byte-exact copies and CRLF sources don't resync."""
+    s, source = storage_with_source
+    source.write_bytes(b"line one\r\nline two\r\n")
+    ref = s.track_source("test", source, None)
+    assert (ref.version_dir / "1.md").read_bytes() == b"line one\r\nline two\r\n"
+
+    assert s.sync_from_source("test").changed is False
+
+    source.write_bytes(b"line one\r\nline 2\r\n")
+    assert s.sync_from_source("test").changed is True
+    assert (ref.version_dir / "2.md").read_bytes() == b"line one\r\nline 2\r\n"
+
+
+def test_version_scan_cache_sees_new_files(
+    storage_with_source: StorageWithSource,
+) -> None:
+    """Test cached version listings refresh when the directory changes."""
+    s, source = storage_with_source
+    source.write_text("v1", encoding="utf-8")
+    ref = s.track_source("test", source, None)
+
+    # Age the directory so its listing is cacheable, then populate the cache
+    os.utime(ref.version_dir, ns=(1_000_000_000, 1_000_000_000))
+    assert [v.version for v in s.list_prompts()[0].versions] == [1]
+
+    # A version added behind the storage's back bumps the directory mtime
+    (ref.version_dir / "2.md").write_text("v2", encoding="utf-8")
+    os.utime(ref.version_dir, ns=(2_000_000_000, 2_000_000_000))
+    assert [v.version for v in s.list_prompts()[0].versions] == [1, 2]
+
+    # The next sync skips past the stray file instead of overwriting it
+    source.write_text("v3", encoding="utf-8")
+    assert s.sync_from_source("test").new_version == 3
+    assert s.read_version("test", 2) == "v2"
+
+
+def test_version_scan_cache_is_per_key_in_shared_dir(tmp_path: Path) -> None:
+    """Test keys sharing a custom version dir never see each other's cached listing."""
+    s = FileSystemPromptStorage(tmp_path)
+    s.ensure_initialized()
+    shared = tmp_path / "versions"
+    for key in ("alpha", "beta"):
+        source = tmp_path / f"{key}.md"
+        source.write_text(f"{key} v1", encoding="utf-8")
+        s.track_source(key, source, shared)
+    s.write_new_version("alpha", "alpha v2")
+
+    # Age the directory so both keys' listings are cacheable
+    os.utime(shared, ns=(1_000_000_000, 1_000_000_000))
+    infos = {info.ref.key: info for info in s.list_prompts()}
+    assert [v.path.name for v in infos["alpha"].versions] == ["alpha-1.md", "alpha-2.md"]
+    assert [v.path.name for v in infos["beta"].versions] == ["beta-1.md"]
+    assert s.read_version("beta", None) == "beta v1"
+
+    assert s.delete_all("beta") == 1
+    assert sorted(p.name for p in shared.iterdir()) == ["alpha-1.md", "alpha-2.md"]
+
+
+def test_sync_skips_hashing_unmodified_source(
+    tmp_path: Path,
+    storage_with_source: StorageWithSource,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test the hash cache lets sync decide unchanged/changed without hashing the source."""
+    s, source = storage_with_source
+    source.write_text("content", encoding="utf-8")
+    s.track_source("test", source, None)
+    os.utime(source, ns=(1_000_000_000, 1_000_000_000))
+
+    compute_file_hash = Mock(wraps=fs_module.compute_file_hash)
+    monkeypatch.setattr(fs_module, "compute_file_hash", compute_file_hash)
+
+    # First sync hashes and records the stat; a fresh instance trusts the record
+    assert s.sync_from_source("test").changed is False
+    assert FileSystemPromptStorage(tmp_path).sync_from_source("test").changed is False
+    assert compute_file_hash.call_args_list.count(call(source)) == 1
+    assert (tmp_path / ".prompts" / "_meta.cache.json").exists()
+
+    # A different size proves the edit without reading the source; the copy is hashed
+    source.write_text("edited", encoding="utf-8")
+    os.utime(source, ns=(2_000_000_000, 2_000_000_000))
+    assert s.sync_from_source("test").new_version == 2
+    assert compute_file_hash.call_args_list.count(call(source)) == 1
+    assert FileSystemPromptStorage(tmp_path).sync_from_source("test").changed is False
+    assert compute_file_hash.call_args_list.count(call(source)) == 1
+
+    # Same size, new mtime: only the hash can tell
+    source.write_text("edites", encoding="utf-8")
+    assert s.sync_from_source("test").new_version == 3
+    assert compute_file_hash.call_args_list.count(call(source)) == 2
+    assert s.read_version("test", 3) == "edites"
+
+
+def test_batch_defers_fsync(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test writes inside batch() skip fsync and the outermost exit syncs them once."""
+    s = FileSystemPromptStorage(tmp_path)
+    s.ensure_initialized()
+    source = tmp_path / "prompt.md"
+    source.write_text("v1", encoding="utf-8")
+    s.track_source("test", source, None)
+
+    fsync = Mock(wraps=s._fsync_path)
+    monkeypatch.setattr(s, "_fsync_path", fsync)
+
+    with s.batch():
+        with s.batch():
+            s.write_new_version("test", "v2")
+        s.write_new_version("test", "v3")
+        fsync.assert_not_called()
+    # One flush at the outermost exit: both versions, then the metadata that names them
+    version_dir = tmp_path / ".prompts" / "test"
+    assert {c.args[0] for c in fsync.call_args_list[:2]} == {
+        version_dir / "2.md",
+        version_dir / "3.md",
+    }
+    assert fsync.call_args_list[2:] == [call(tmp_path / ".prompts" / "_meta.json")]
+    assert s._meta_dirty is False
+    assert s._unsynced_versions == []
+
+    # Metadata written during the batch is visible to other instances
+    assert FileSystemPromptStorage(tmp_path).get_prompt_ref("test").key == "test"
+    assert s.read_version("test", None) == "v3"
+
+
+def test_retrack_over_kept_versions_continues_numbering(
+    storage_with_source: StorageWithSource,
+) -> None:
+    """Test re-tracking a key whose versions were kept doesn't overwrite them."""
+    s, source = storage_with_source
+    source.write_text("first", encoding="utf-8")
+    s.track_source("test", source, None)
+    s.untrack("test", keep_versions=True)
+
+    source.write_text("second", encoding="utf-8")
+    s.track_source("test", source, None)
+    assert s.read_version("test", 1) == "first"
+    assert s.read_version("test", 2) == "second"
+
+
+def test_list_prompts_scans_versions_on_access(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test list_prompts defers each version scan until versions are read."""
+    s = FileSystemPromptStorage(tmp_path)
+    s.ensure_initialized()
+    for name in ("one", "two"):
+        source = tmp_path / f"{name}.md"
+        source.write_text(name, encoding="utf-8")
+        s.track_source(name, source, None)
+
+    scan = Mock(wraps=s._scan_versions)
+    monkeypatch.setattr(s, "_scan_versions", scan)
+
+    infos = s.list_prompts()
+    assert [info.ref.key for info in infos] == ["one", "two"]
+    scan.assert_not_called()
+
+    assert [v.version for v in infos[1].versions] == [1]
+    assert len(infos[1].versions) == 1
+    assert [c.args[0] for c in scan.call_args_list] == ["two"]
+
+
+def test_sync_all_sources_many_keys_keeps_order(tmp_path: Path) -> None:
+    """Test parallel probing still reports results per key in metadata order."""
+    s = FileSystemPromptStorage(tmp_path)
+    s.ensure_initialized()
+    keys = [f"p{i}" for i in range(6)]
+    for key in keys:
+        source = tmp_path / f"{key}.md"
+        source.write_text(key, encoding="utf-8")
+        s.track_source(key, source, None)
+
+    (tmp_path / "p1.md").write_text("p1 changed", encoding="utf-8")
+    (tmp_path / "p4.md").unlink()
+
+    results = s.sync_all_sources()
+    assert [r.key for r in results] == keys
+    assert [r.changed for r in results] == [False, True, False, False, False, False]
+    assert "Source file not found" in results[4].message
+    assert s.read_version("p1", None) == "p1 changed"
+
+
+def test_sync_all_sources_reports_source_deleted_after_probe(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test a source removed between its probe and its copy doesn't abort the other keys."""
+    s = FileSystemPromptStorage(tmp_path)
+    s.ensure_initialized()
+    for name in ("one", "two"):
+        source = tmp_path / f"{name}.md"
+        source.write_text(name, encoding="utf-8")
+        s.track_source(name, source, None)
+        source.write_text(f"{name} modified", encoding="utf-8")
+
+    real_probe = s._probe_source
+
+    def probe_then_delete(cfg: object, source_file: Path, force: bool) -> object:
+        probe = real_probe(cfg, source_file, force)  # type: ignore[arg-type]
+        if source_file.name == "one.md":
+            source_file.unlink()
+        return probe
+
+    monkeypatch.setattr(s, "_probe_source", Mock(side_effect=probe_then_delete))
+
+    one, two = s.sync_all_sources()
+    assert one.changed is False
+    assert "Source file not found" in one.message
+    assert two.new_version == 2
+    assert [v.version for v in s.list_prompts()[0].versions] == [1]
+
+
+def test_mutations_on_unknown_key_raise_prompt_not_found(tmp_path: Path) -> None:
+    """Test mutating methods report unknown keys without a separate existence check."""
+    s = FileSystemPromptStorage(tmp_path)
+    s.ensure_initialized()
+
+    with pytest.raises(PromptNotFound):
+        s.write_new_version("missing", "content")
+    with pytest.raises(PromptNotFound):
+        s.delete_latest("missing")
+    with pytest.raises(PromptNotFound):
+        s.delete_all("missing")
+    with pytest.raises(PromptNotFound):
+        s.untrack("missing", keep_versions=True)
+    with pytest.raises(PromptNotFound):
+        s.untrack("missing", keep_versions=False)
+
+
+def test_identical_versions_are_separate_files(
+    storage_with_source: StorageWithSource,
+) -> None:
+    """Test a repeated version is its own copy, so editing one leaves the other intact."""
+    s, source = storage_with_source
+    source.write_text("content", encoding="utf-8")
+    ref = s.track_source("test", source, None)
+
+    s.sync_from_source("test", force=True)
+    v1, v2 = ref.version_dir / "1.md", ref.version_dir / "2.md"
+    assert not v2.samefile(v1)
+
+    # Editors may write multi-link files in place; that must not rewrite history
+    with open(v2, "r+", encoding="utf-8") as f:
+        f.write("CONTENT")
+    assert s.read_version("test", 1) == "content"
+
+
+def test_sync_copies_without_kernel_copy_support(
+    tmp_path: Path, storage_with_source: StorageWithSource, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test version copies fall back to a buffered copy when clone/copy_file_range fail."""
+
+    def unsupported(*args: object) -> int:
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(io_safety, "_FICLONE", None)
+    monkeypatch.setattr(io_safety.os, "copy_file_range", unsupported, raising=False)
+
+    s, source = storage_with_source
+    source.write_bytes(b"v1\r\n")
+    s.track_source("test", source, None)
+    source.write_bytes(b"v2\xe2\x80\x94\r\n")
+    assert s.sync_from_source("test").new_version == 2
+
+    assert (tmp_path / ".prompts" / "test" / "1.md").read_bytes() == b"v1\r\n"
+    assert (tmp_path / ".prompts" / "test" / "2.md").read_bytes() == b"v2\xe2\x80\x94\r\n"
+    assert s.sync_from_source("test").changed is False
+
+
+def test_sync_recopies_when_copy_file_range_stops_short(
+    storage_with_source: StorageWithSource, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test a copy_file_range that reports EOF early doesn't leave a truncated version."""
+    s, source = storage_with_source
+    source.write_text("v1", encoding="utf-8")
+    s.track_source("test", source, None)
+    os.utime(source, ns=(1_000_000_000, 1_000_000_000))
+    assert s.sync_from_source("test").changed is False  # Records the stat
+
+    copied: list[int] = []
+
+    def short_copy(src: int, dst: int, count: int, *args: object) -> int:
+        if copied:
+            return 0
+        copied.append(os.write(dst, os.read(src, 2)))
+        return copied[-1]
+
+    monkeypatch.setattr(io_safety, "_FICLONE", None)
+    monkeypatch.setattr(io_safety.os, "copy_file_range", short_copy, raising=False)
+
+    # A size change takes the path that records the new stat without hashing the source
+    source.write_text("version two", encoding="utf-8")
+    os.utime(source, ns=(2_000_000_000, 2_000_000_000))
+    assert s.sync_from_source("test").new_version == 2
+    assert copied == [2]
+    assert s.read_version("test", 2) == "version two"
+    assert s.sync_from_source("test").changed is False